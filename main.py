@@ -1,23 +1,39 @@
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
+
 import uvicorn
-from fastapi import FastAPI, Depends
-from fastapi.responses import RedirectResponse
-from sqlalchemy import select
+from fastapi import FastAPI, Depends, Query
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy import select, Table
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.tenders.router import router as tenders_router
 from src.api.bids.router import router as binds_router
 
-from src.database.database import get_db
+from src.database.database import get_db, async_engine, replica_engines
 from src.database.init_database import init_db
 
 from src.api.employees.models import MEmployee
 from src.api.organisations.models import MOrganization, MOrganizationResponsible
+from src.api.organisations.cache import responsible_cache
+from src.api.tenders.cache import tender_list_cache
+from src.api.streaming import json_array_chunks
+from src.monitoring.metrics import setup_metrics, instrument_engine, register_cache
+from src.monitoring.profiling import setup_profiling
 from src.settings import settings
 
 app = FastAPI(title='Avito Tender Management API')
 app.include_router(tenders_router)
 app.include_router(binds_router)
 
+setup_profiling(app)
+setup_metrics(app)
+instrument_engine(async_engine)
+for i, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, name=f'replica_{i}')
+register_cache('organization_responsible', responsible_cache)
+register_cache('tender_list', tender_list_cache)
+
 
 @app.get("/")
 def root():
@@ -29,25 +45,56 @@ def ping():
     return "ok"
 
 
+async def table_batches(
+        db: AsyncSession, table: Table, limit: int | None, after: UUID | None, batch_size: int = 1000
+) -> AsyncIterator[Sequence[dict]]:
+    """
+    Строки таблицы в порядке id пачками по batch_size: выбираются только колонки (без ORM-объектов)
+    и читаются серверным курсором. Keyset-пагинация: after - id последней строки предыдущей страницы.
+    """
+    query = select(*table.columns).order_by(table.c.id).execution_options(yield_per=batch_size)
+    if after:
+        query = query.where(table.c.id > after)
+    if limit:
+        query = query.limit(limit)
+    result = await db.stream(query)
+    async for batch in result.mappings().partitions():
+        yield [dict(row) for row in batch]
+
+
+def stream_table(db: AsyncSession, table: Table, limit: int | None, after: UUID | None) -> StreamingResponse:
+    return StreamingResponse(
+        json_array_chunks(table_batches(db, table, limit=limit, after=after)),
+        media_type='application/json',
+    )
+
+
+# сессия с scope='request' живет, пока ответ не отправлен целиком: строки читаются во время отправки
 @app.get("/employee/get_all")
-async def get_all_employee(db: AsyncSession = Depends(get_db)):
-    quety = select(MEmployee)
-    res = await db.execute(quety)
-    return res.scalars().all()
+async def get_all_employee(
+        limit: Optional[int] = Query(None, ge=1),
+        after: Optional[UUID] = None,
+        db: AsyncSession = Depends(get_db),
+):
+    return stream_table(db, MEmployee.__table__, limit=limit, after=after)
 
 
 @app.get("/organisation/get_all")
-async def get_all_organisaion(db: AsyncSession = Depends(get_db)):
-    quety = select(MOrganization)
-    res = await db.execute(quety)
-    return res.scalars().all()
+async def get_all_organisaion(
+        limit: Optional[int] = Query(None, ge=1),
+        after: Optional[UUID] = None,
+        db: AsyncSession = Depends(get_db),
+):
+    return stream_table(db, MOrganization.__table__, limit=limit, after=after)
 
 
 @app.get("/organisation_responsible/get_all")
-async def get_all_organisation_responsible(db: AsyncSession = Depends(get_db)):
-    quety = select(MOrganizationResponsible)
-    res = await db.execute(quety)
-    return res.scalars().all()
+async def get_all_organisation_responsible(
+        limit: Optional[int] = Query(None, ge=1),
+        after: Optional[UUID] = None,
+        db: AsyncSession = Depends(get_db),
+):
+    return stream_table(db, MOrganizationResponsible.__table__, limit=limit, after=after)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,44 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from src.database.database import Base
+from src.settings import settings
+
+from src.api.tenders.models import MTender, MTenderData
+from src.api.bids.models import MBid, MBidData, MBidFeedback, MBidDecision
+from src.api.organisations.models import MOrganization, MOrganizationResponsible
+from src.api.employees.models import MEmployee
+from src.api.text_blobs.models import MTextBlob
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.db.url(is_async=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    sync_engine = create_engine(settings.db.url(is_async=False))
+    with sync_engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,121 @@
+"""initial schema
+
+Схема в том виде, в котором ее создавал Base.metadata.create_all.
+Таблицы создаются только если их еще нет, поэтому ревизия безопасно применяется
+к уже развернутым базам (employee и organization обычно создаются заранее).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DO $$ BEGIN "
+        "CREATE TYPE organization_type AS ENUM ('IE', 'LLC', 'JSC'); "
+        "EXCEPTION WHEN duplicate_object THEN NULL; "
+        "END $$;"
+    )
+    op.create_table(
+        'employee',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('username', sa.String(50), nullable=False, unique=True),
+        sa.Column('first_name', sa.String(50)),
+        sa.Column('last_name', sa.String(50)),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'organization',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('type', postgresql.ENUM('IE', 'LLC', 'JSC', name='organization_type', create_type=False)),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'organization_responsible',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('organization_id', sa.UUID(), sa.ForeignKey('organization.id', ondelete='CASCADE')),
+        sa.Column('user_id', sa.UUID(), sa.ForeignKey('employee.id', ondelete='CASCADE')),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'tender',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('organization_id', sa.UUID(), sa.ForeignKey('organization.id'), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'tender_data',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('tender_id', sa.UUID(), sa.ForeignKey('tender.id'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('service_type', sa.String(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'bid',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('tender_id', sa.UUID(), sa.ForeignKey('tender.id'), nullable=False),
+        sa.Column('author_type', sa.String(), nullable=False),
+        sa.Column('author_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'bid_data',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('bid_id', sa.UUID(), sa.ForeignKey('bid.id'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'bid_feedback',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('bid_id', sa.UUID(), sa.ForeignKey('bid.id'), nullable=False),
+        sa.Column('feedback', sa.String(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'bid_decision',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('bid_id', sa.UUID(), sa.ForeignKey('bid.id'), nullable=False),
+        sa.Column('employee_id', sa.UUID(), sa.ForeignKey('employee.id'), nullable=False),
+        sa.Column('decision', sa.String(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bid_decision')
+    op.drop_table('bid_feedback')
+    op.drop_table('bid_data')
+    op.drop_table('bid')
+    op.drop_table('tender_data')
+    op.drop_table('tender')
@@ -0,0 +1,37 @@
+"""current version pointers
+
+Указатели tender.current_data_id / bid.current_data_id на строку с текущей версией
+и их заполнение для уже существующих строк.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ['tender', 'bid']:
+        op.execute(
+            f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS current_data_id UUID '
+            f'CONSTRAINT fk_{table}_current_data_id REFERENCES {table}_data(id)'
+        )
+        op.execute(
+            f'UPDATE {table} SET current_data_id = ('
+            f'SELECT {table}_data.id FROM {table}_data '
+            f'WHERE {table}_data.{table}_id = {table}.id '
+            f'ORDER BY {table}_data.version DESC LIMIT 1'
+            f') WHERE current_data_id IS NULL'
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('bid', 'current_data_id')
+    op.drop_column('tender', 'current_data_id')
@@ -0,0 +1,68 @@
+"""hot path indexes
+
+Индексы под WHERE-условия запросов TenderCRUD, BidCRUD и OrganizationCRUD
+и уникальность номера версии в пределах тендера/предложения.
+Уникальные ограничения (entity_id, version) сами создают составной индекс,
+поэтому отдельные индексы на tender_data(tender_id, version) и bid_data(bid_id, version) не нужны.
+
+До ограничений параллельные правки могли выделить один номер версии дважды. Такие строки не удаляются
+(в каждой своя правка), а версии сущности перенумеровываются по порядку: дубликаты сортируются по id,
+строка, на которую указывает current_data_id, идет последней в своей группе и остается последней версией.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def renumber_duplicate_versions(table: str) -> None:
+    op.execute(
+        f'UPDATE {table}_data SET version = renumbered.version FROM ('
+        f'SELECT {table}_data.id, row_number() OVER ('
+        f'PARTITION BY {table}_data.{table}_id ORDER BY {table}_data.version, '
+        f'coalesce({table}_data.id = {table}.current_data_id, false), {table}_data.id'
+        f') AS version '
+        f'FROM {table}_data JOIN {table} ON {table}.id = {table}_data.{table}_id '
+        f'WHERE {table}_data.{table}_id IN ('
+        f'SELECT {table}_id FROM {table}_data GROUP BY {table}_id, version HAVING count(*) > 1'
+        f')'
+        f') AS renumbered '
+        f'WHERE {table}_data.id = renumbered.id AND {table}_data.version <> renumbered.version'
+    )
+
+
+def upgrade() -> None:
+    renumber_duplicate_versions('tender')
+    renumber_duplicate_versions('bid')
+    op.create_unique_constraint('uq_tender_data_tender_id_version', 'tender_data', ['tender_id', 'version'])
+    op.create_unique_constraint('uq_bid_data_bid_id_version', 'bid_data', ['bid_id', 'version'])
+    op.create_index('ix_bid_tender_id', 'bid', ['tender_id'], if_not_exists=True)
+    op.create_index('ix_bid_author_type_author_id', 'bid', ['author_type', 'author_id'], if_not_exists=True)
+    op.create_index('ix_bid_feedback_bid_id', 'bid_feedback', ['bid_id'], if_not_exists=True)
+    op.create_index(
+        'ix_bid_decision_bid_id_employee_id', 'bid_decision', ['bid_id', 'employee_id'], if_not_exists=True
+    )
+    op.create_index(
+        'ix_organization_responsible_organization_id_user_id',
+        'organization_responsible',
+        ['organization_id', 'user_id'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organization_responsible_organization_id_user_id', table_name='organization_responsible')
+    op.drop_index('ix_bid_decision_bid_id_employee_id', table_name='bid_decision')
+    op.drop_index('ix_bid_feedback_bid_id', table_name='bid_feedback')
+    op.drop_index('ix_bid_author_type_author_id', table_name='bid')
+    op.drop_index('ix_bid_tender_id', table_name='bid')
+    op.drop_constraint('uq_bid_data_bid_id_version', 'bid_data', type_='unique')
+    op.drop_constraint('uq_tender_data_tender_id_version', 'tender_data', type_='unique')
@@ -0,0 +1,34 @@
+"""bid decision counters
+
+Счетчики одобрений/отклонений в bid и их заполнение по уже принятым решениям.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bid', sa.Column('approved_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('bid', sa.Column('rejected_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE bid SET "
+        "approved_count = (SELECT count(*) FROM bid_decision "
+        "WHERE bid_decision.bid_id = bid.id AND bid_decision.decision = 'Approved'), "
+        "rejected_count = (SELECT count(*) FROM bid_decision "
+        "WHERE bid_decision.bid_id = bid.id AND bid_decision.decision = 'Rejected')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('bid', 'rejected_count')
+    op.drop_column('bid', 'approved_count')
@@ -0,0 +1,44 @@
+"""text blobs
+
+Дедуплицированное хранение описаний версий: таблица text_blob и ссылки на нее из tender_data и bid_data.
+Описание версии хранится либо в колонке description, либо в text_blob по description_hash.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'text_blob',
+        sa.Column('hash', sa.String(64), primary_key=True),
+        sa.Column('content', sa.Text(), nullable=False),
+    )
+    for table in ('tender_data', 'bid_data'):
+        op.add_column(table, sa.Column('description_hash', sa.String(64), sa.ForeignKey('text_blob.hash')))
+        op.alter_column(table, 'description', existing_type=sa.String(), nullable=True)
+        op.create_check_constraint(
+            f'ck_{table}_description_stored', table, 'description IS NOT NULL OR description_hash IS NOT NULL'
+        )
+
+
+def downgrade() -> None:
+    for table in ('tender_data', 'bid_data'):
+        op.execute(
+            f"UPDATE {table} SET description = text_blob.content "
+            f"FROM text_blob WHERE text_blob.hash = {table}.description_hash"
+        )
+        op.drop_constraint(f'ck_{table}_description_stored', table, type_='check')
+        op.alter_column(table, 'description', existing_type=sa.String(), nullable=False)
+        op.drop_column(table, 'description_hash')
+    op.drop_table('text_blob')
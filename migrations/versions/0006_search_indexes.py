@@ -0,0 +1,45 @@
+"""search indexes
+
+Индексы для параметра q в списках тендеров и предложений (см. src/api/search.py):
+GIN по to_tsvector(название + описание в строке версии), GIN по to_tsvector(text_blob.content)
+для дедуплицированных описаний и GIN pg_trgm по названию (опечатки, подстроки).
+Выражения должны совпадать с выражениями в запросах, иначе индексы не будут использоваться.
+Поиск идет по версиям и соединяется с tender/bid по указателю на текущую версию, поэтому нужны
+индексы на current_data_id, а для проверки описаний в text_blob - на description_hash.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('tender_data', 'bid_data'):
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} "
+            f"USING gin (to_tsvector('simple', name || ' ' || coalesce(description, '')))"
+        )
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)')
+        op.create_index(f'ix_{table}_description_hash', table, ['description_hash'], if_not_exists=True)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_text_blob_search ON text_blob USING gin (to_tsvector('simple', content))")
+    op.create_index('ix_tender_current_data_id', 'tender', ['current_data_id'], if_not_exists=True)
+    op.create_index('ix_bid_current_data_id', 'bid', ['current_data_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bid_current_data_id', table_name='bid')
+    op.drop_index('ix_tender_current_data_id', table_name='tender')
+    op.drop_index('ix_text_blob_search', table_name='text_blob')
+    for table in ('tender_data', 'bid_data'):
+        op.drop_index(f'ix_{table}_description_hash', table_name=table)
+        op.drop_index(f'ix_{table}_name_trgm', table_name=table)
+        op.drop_index(f'ix_{table}_search', table_name=table)
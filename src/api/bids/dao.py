@@ -1,20 +1,28 @@
-from typing import List
-from uuid import UUID
+from typing import Iterable, List
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
-from sqlalchemy import select, desc
+from sqlalchemy import select, or_, and_, insert, update, exists
+from sqlalchemy.orm.attributes import set_committed_value
 
 from src.api.bids.models import MBid, MBidData, BidStatus, BidAuthorType, MBidFeedback, BidDecision, MBidDecision
-from src.api.bids.schemas import SBindCreate, SBindRead, SBindUpdate, SReviewRequest
-from src.api.dao import DAO
+from src.api.bids.schemas import SBindCreate, SBindRead, SBindUpdate, SReviewRequest, SBindBulkResult
+from src.api.dao import request_cached
+from src.api.schemas import SBulkError, SVersionHistory
+from src.api.etag import make_etag
+from src.api.pagination import after_cursor_clause
+from src.api.search import text_search, raise_if_search_with_cursor
 from src.api.employees.dao import EmployeeCRUD
 from src.api.employees.models import MEmployee
 from src.api.organisations.dao import OrganizationCRUD
-from src.api.organisations.models import MOrganizationResponsible
+from src.api.text_blobs.dao import TextBlobCRUD
+from src.api.versions import (
+    get_version_history, select_version_fields, check_expected_version, ExpectedVersion,
+)
 from src.api.tenders.models import MTender, TenderStatus
 
 
-class BidCRUD(DAO):
+class BidCRUD(TextBlobCRUD):
     async def _add_obj_to_obj_db(
             self, status: BidStatus, tender_id, author_type: BidAuthorType, author_id: UUID
     ) -> MBid:
@@ -26,15 +34,31 @@ class BidCRUD(DAO):
         ))
 
     async def _add_obj_to_obj_data_db(
-            self, bid_id: UUID, name: str, description: str, version: int, **kwargs
+            self, bid_id: UUID, name: str, description: str, version: int, stored_description: dict | None = None, **kwargs
     ) -> MBidData:
-        return await self._add_to_db(MBidData(
+        """
+        stored_description - колонки уже сохраненного описания (см. TextBlobCRUD._stored_text_columns),
+        если описание не менялось: тогда текст повторно не записывается
+        """
+        if stored_description is None:
+            stored_description = await self._store_text(description)
+        m_bid_data = await self._add_to_db(MBidData(
             bid_id=bid_id,
             name=name,
-            description=description,
             version=version,
+            **stored_description,
         ))
+        set_committed_value(m_bid_data, 'description', description)
+        return m_bid_data
+
+    async def _set_current_data(self, m_bid: MBid, m_bid_data: MBidData) -> MBid:
+        """
+        Переключение указателя текущей версии предложения на m_bid_data
+        """
+        m_bid.current_data_id = m_bid_data.id
+        return await self._add_to_db(m_bid)
 
+    @request_cached('bid')
     async def _get_obj_by_id(self, bid_id: UUID) -> MBid:
         query = select(MBid).where(MBid.id == bid_id)
         m_bid = await self.db.execute(query)
@@ -43,12 +67,29 @@ class BidCRUD(DAO):
             raise HTTPException(status_code=404, detail=f"Bind with id={bid_id} not found.")
         return m_bid
 
+    async def _lock_obj_by_id(self, bid_id: UUID) -> MBid:
+        """
+        Загрузка предложения с блокировкой строки (SELECT ... FOR UPDATE) до конца транзакции, чтобы параллельные
+        правки одного предложения выделяли номера версий по очереди. Заменяет обычную загрузку в кэше запроса,
+        поэтому проверка прав не делает отдельный запрос
+        """
+        query = (
+            select(MBid).
+            where(MBid.id == bid_id).
+            with_for_update().
+            execution_options(populate_existing=True)
+        )
+        m_bid = (await self.db.execute(query)).scalar_one_or_none()
+        if not m_bid:
+            raise HTTPException(status_code=404, detail=f"Bind with id={bid_id} not found.")
+        self._set_request_cached('bid', bid_id, value=m_bid)
+        return m_bid
+
     async def _get_obj_data_with_last_version_by_id(self, bid_id: UUID) -> MBidData:
         query = (
             select(MBidData).
-            where(MBidData.bid_id == bid_id).
-            order_by(desc(MBidData.version)).
-            limit(1)
+            join(MBid, MBid.current_data_id == MBidData.id).
+            where(MBid.id == bid_id)
         )
         m_bid_data_with_last_version = await self.db.execute(query)
         m_bid_data_with_last_version = m_bid_data_with_last_version.scalar_one_or_none()
@@ -71,6 +112,7 @@ class BidCRUD(DAO):
             )
         return m_bid_data
 
+    @request_cached('tender')
     async def get_tender_by_id(self, tender_id):
         m_tender = await self.db.execute(select(MTender).where(MTender.id == tender_id))
         m_tender = m_tender.scalar_one_or_none()
@@ -78,6 +120,10 @@ class BidCRUD(DAO):
             raise HTTPException(status_code=404, detail=f"Tender with id={tender_id} not found")
         return m_tender
 
+    async def _get_existing_tender_ids(self, tender_ids: Iterable[UUID]) -> set[UUID]:
+        query = select(MTender.id).where(MTender.id.in_(set(tender_ids)))
+        return set((await self.db.execute(query)).scalars())
+
     async def get_response_schema(
             self,
             bid_id: UUID | None = None,
@@ -137,65 +183,186 @@ class BidDAO(BidCRUD, OrganizationCRUD, EmployeeCRUD):
             description=bid.description,
             version=1,
         )
+        m_bid = await self._set_current_data(m_bid, m_bid_data)
         return await self.get_response_schema(bid=m_bid, bid_data=m_bid_data)
 
-    async def update_bid_by_id(self, bid_id: UUID, bid_update_data: SBindUpdate, username: str):
-        # проверка прав доступа
+    async def create_bids_bulk(self, bids: List[SBindCreate]) -> List[SBindBulkResult]:
+        """
+        Создание пачки предложений в одной транзакции.
+        Авторы и тендеры проверяются на всю пачку несколькими запросами с IN (...), строки bid и bid_data
+        вставляются многострочными INSERT ... RETURNING. Результат (предложение или ошибка) отдается для каждого элемента.
+        """
+        organization_ids = await self._get_existing_organization_ids(
+            bid.authorId for bid in bids if bid.authorType == BidAuthorType.organization
+        )
+        employee_ids = await self._get_existing_employee_ids(
+            bid.authorId for bid in bids if bid.authorType == BidAuthorType.user
+        )
+        tender_ids = await self._get_existing_tender_ids(bid.tenderId for bid in bids)
+
+        results = [SBindBulkResult(index=index) for index in range(len(bids))]
+        valid = []
+        for index, bid in enumerate(bids):
+            if bid.authorType == BidAuthorType.organization and bid.authorId not in organization_ids:
+                error = SBulkError(statusCode=404, detail=f"Organization with id={bid.authorId} not found.")
+            elif bid.authorType == BidAuthorType.user and bid.authorId not in employee_ids:
+                error = SBulkError(statusCode=404, detail=f"Employee with id={bid.authorId} not found.")
+            elif bid.tenderId not in tender_ids:
+                error = SBulkError(statusCode=404, detail=f"Tender with id={bid.tenderId} not found")
+            else:
+                valid.append((index, bid))
+                continue
+            results[index].error = error
+        if not valid:
+            return results
+
+        # id генерируются заранее, чтобы связать bid, bid_data и указатель на текущую версию без лишних запросов
+        bid_rows = [
+            {
+                'id': uuid4(),
+                'status': BidStatus.created,
+                'tender_id': bid.tenderId,
+                'author_type': bid.authorType,
+                'author_id': bid.authorId,
+            }
+            for _, bid in valid
+        ]
+        stored_descriptions = await self._store_texts(bid.description for _, bid in valid)
+        bid_data_rows = [
+            {'id': uuid4(), 'bid_id': bid_row['id'], 'name': bid.name, 'version': 1, **stored_description}
+            for bid_row, (_, bid), stored_description in zip(bid_rows, valid, stored_descriptions)
+        ]
+        created = await self.db.execute(
+            insert(MBid).returning(MBid.created_at, sort_by_parameter_order=True),
+            bid_rows,
+        )
+        created_at = created.scalars().all()
+        await self.db.execute(insert(MBidData), bid_data_rows)
+        await self.db.execute(update(MBid), [
+            {'id': bid_row['id'], 'current_data_id': bid_data_row['id']}
+            for bid_row, bid_data_row in zip(bid_rows, bid_data_rows)
+        ])
+
+        for (index, bid), bid_row, bid_created_at in zip(valid, bid_rows, created_at):
+            results[index].bid = SBindRead(
+                id=bid_row['id'],
+                name=bid.name,
+                status=BidStatus.created,
+                authorType=bid.authorType,
+                authorId=bid.authorId,
+                version=1,
+                createdAt=bid_created_at,
+            )
+        return results
+
+    async def update_bid_by_id(
+            self,
+            bid_id: UUID,
+            bid_update_data: SBindUpdate,
+            username: str,
+            expected_version: ExpectedVersion | None = None,
+    ):
+        # блокировка предложения до конца транзакции и проверка прав доступа
+        await self._lock_obj_by_id(bid_id)
         await self.raise_exception_if_forbidden(username=username, bid_id=bid_id)
 
         # получение данных последней версии по предложению
         m_bid_data_with_last_version = await self._get_obj_data_with_last_version_by_id(bid_id)
+        check_expected_version(
+            m_bid_data_with_last_version.version, await self.get_bid_etag(bid_id), expected_version
+        )
 
         # обновление данных предложения
-        new_bid_data = {**m_bid_data_with_last_version.__dict__}
+        new_bid_data = {
+            'bid_id': bid_id,
+            'name': m_bid_data_with_last_version.name,
+            'description': m_bid_data_with_last_version.description,
+            'version': m_bid_data_with_last_version.version + 1,
+            'stored_description': self._stored_text_columns(m_bid_data_with_last_version),
+        }
         for key, value in bid_update_data.model_dump(exclude_unset=True).items():
+            if key == 'description':
+                new_bid_data['stored_description'] = None
             new_bid_data[key] = value
-        new_bid_data['version'] += 1
 
         # добавление новых данных в БД данных предложений
         m_new_bid_data = await self._add_obj_to_obj_data_db(**new_bid_data)
+        m_bid = await self._set_current_data(await self._get_obj_by_id(bid_id), m_new_bid_data)
 
-        return await self.get_response_schema(bid_id=bid_id, bid_data=m_new_bid_data)
+        return await self.get_response_schema(bid=m_bid, bid_data=m_new_bid_data)
 
-    async def get_bids_by_kwargs(self, **kwargs) -> List[SBindRead]:
+    PAGE_KEY_COLUMNS = (MBid.id, MBidData.version, MBid.status, MBidData.name)
+
+    async def _bids_page_query(self, columns, **kwargs):
         limit: int | None = kwargs.get('limit', 5)
         offset: int | None = kwargs.get('offset', 0)
         tender_id: UUID | None = kwargs.get('tender_id', None)
         username: str | None = kwargs.get('username', None)
-
-        query = select(MBid)
-        m_bids = await self.db.execute(query)
-        m_bids = m_bids.scalars()
+        after: str | None = kwargs.get('after', None)
+        q: str | None = kwargs.get('q', None)
+        raise_if_search_with_cursor(q=q, after=after)
 
         if tender_id:
             await self.get_tender_by_id(tender_id=tender_id)
 
-        bid_schemas = []
-        for m_bid in m_bids:
-            # фильтр на tender_id
-            if tender_id and m_bid.tender_id != tender_id:
-                continue
+        # фильтрация, сортировка и пагинация выполняются одним запросом в БД
+        query = (
+            select(*columns).
+            join(MBidData, MBidData.id == MBid.current_data_id).
+            join(MTender, MTender.id == MBid.tender_id)
+        )
+
+        # фильтр на tender_id
+        if tender_id:
+            query = query.where(MBid.tender_id == tender_id)
 
-            # фильтер на username (права доступа)
+        # фильтер на username (права доступа)
+        if username:
             m_user = await self._get_employee_by_username(username=username)
-            if username:
-                add_flag = False
-                if m_bid.status == BidStatus.published:  # разрешить, если статус 'Published'
-                    add_flag = True
-                elif await self.user_is_author(m_bid=m_bid, m_user=m_user):
-                    add_flag = True
-                elif await self.user_is_responsible_of_tender_related_to_bid(m_bid=m_bid, m_user=m_user):
-                    add_flag = True
-                elif await self.user_is_responsible_of_author_organization(m_bid=m_bid, m_user=m_user):
-                    add_flag = True
-                if add_flag:
-                    m_bid_data = await self._get_obj_data_with_last_version_by_id(m_bid.id)
-                    bid_schemas.append(
-                        await self.get_response_schema(bid=m_bid, bid_data=m_bid_data)
-                    )
-
-        bid_schemas.sort(key=lambda x: x.name)
-        return bid_schemas[offset:offset + limit]
+            query = query.where(self.user_can_see_bid_clause(m_user=m_user))
+
+        # keyset-пагинация: строки строго после курсора (name, id) предыдущей страницы
+        if after:
+            query = query.where(after_cursor_clause(MBidData.name, MBid.id, after))
+
+        # поиск по названию и описанию текущей версии, сортировка по релевантности
+        if q:
+            search_clause, rank = text_search(MBidData, q)
+            query = query.where(search_clause).order_by(rank.desc(), MBid.id)
+        else:
+            query = query.order_by(MBidData.name, MBid.id)
+
+        return query.offset(offset).limit(limit)
+
+    async def get_bids_by_kwargs(self, **kwargs) -> List[SBindRead]:
+        rows = await self.db.execute(await self._bids_page_query((MBid, MBidData), **kwargs))
+        return [
+            await self.get_response_schema(bid=m_bid, bid_data=m_bid_data_with_last_version)
+            for m_bid, m_bid_data_with_last_version in rows
+        ]
+
+    async def get_bids_page_keys(self, **kwargs):
+        """
+        Строки страницы (id, version, status, name) с теми же фильтрами, что у get_bids_by_kwargs:
+        их достаточно для ETag и курсора, поэтому проверка If-None-Match не загружает описания и не строит схемы
+        """
+        return (await self.db.execute(await self._bids_page_query(self.PAGE_KEY_COLUMNS, **kwargs))).all()
+
+    def user_can_see_bid_clause(self, m_user: MEmployee):
+        """
+        SQL-условие видимости предложения для пользователя (запрос должен содержать join с MTender):
+        предложение опубликовано, или пользователь его автор, или пользователь ответственный
+        за организацию тендера, или пользователь ответственный за организацию-автора предложения
+        """
+        return or_(
+            MBid.status == BidStatus.published,
+            and_(MBid.author_type == BidAuthorType.user, MBid.author_id == m_user.id),
+            self.user_is_responsible_clause(organization_id=MTender.organization_id, user_id=m_user.id),
+            and_(
+                MBid.author_type == BidAuthorType.organization,
+                self.user_is_responsible_clause(organization_id=MBid.author_id, user_id=m_user.id),
+            ),
+        )
 
     async def user_is_author(self, m_bid: MBid, m_user: MEmployee) -> bool:
         if m_bid.author_type == BidAuthorType.user and m_bid.author_id == m_user.id:
@@ -249,6 +416,15 @@ class BidDAO(BidCRUD, OrganizationCRUD, EmployeeCRUD):
             raise HTTPException(status_code=403, detail="You can't see status")
         return m_bid.status
 
+    async def get_bid_etag(self, bid_id: UUID) -> str:
+        """
+        ETag предложения: меняется при смене статуса (status и updated_at: в SQLite время с точностью до секунды)
+        и при каждой новой версии (current_data_id).
+        Строка берется из кэша запроса, поэтому после проверки прав дополнительных запросов нет
+        """
+        m_bid = await self._get_obj_by_id(bid_id)
+        return make_etag(m_bid.id, m_bid.status, m_bid.updated_at, m_bid.current_data_id)
+
     async def change_bid_status_by_id(self, bid_id: UUID, status: BidStatus, username: str):
         m_bid = await self._get_obj_by_id(bid_id)
         m_user = await self._get_employee_by_username(username=username)
@@ -258,25 +434,64 @@ class BidDAO(BidCRUD, OrganizationCRUD, EmployeeCRUD):
         if not flag1 and not flag2 and not flag3:
             raise HTTPException(status_code=403, detail="You can't see status")
         setattr(m_bid, 'status', status)
-        await self.db.commit()
+        await self.db.flush()
         return await self.get_response_schema(
             bid=m_bid
         )
 
-    async def rollback_bid(self, bid_id: UUID, version: int, username: str):
+    VERSION_FIELDS = {
+        'name': MBidData.name,
+        'description': MBidData.description,
+    }
+
+    async def get_bid_versions(
+            self,
+            bid_id: UUID,
+            username: str,
+            from_version: int = 1,
+            to_version: int | None = None,
+            limit: int | None = None,
+            fields: str | None = None,
+            diff_from: int | None = None,
+            diff_to: int | None = None,
+    ) -> SVersionHistory:
+        """
+        История версий предложения доступна автору и ответственным (как редактирование и откат)
+        """
+        await self.raise_exception_if_forbidden(username=username, bid_id=bid_id)
+        return await get_version_history(
+            self.db,
+            version_column=MBidData.version,
+            owner_clause=MBidData.bid_id == bid_id,
+            fields=select_version_fields(fields, self.VERSION_FIELDS),
+            from_version=from_version,
+            to_version=to_version,
+            limit=limit,
+            diff_from=diff_from,
+            diff_to=diff_to,
+        )
+
+    async def rollback_bid(
+            self, bid_id: UUID, version: int, username: str, expected_version: ExpectedVersion | None = None
+    ):
+        await self._lock_obj_by_id(bid_id)
         await self.raise_exception_if_forbidden(username=username, bid_id=bid_id)
 
         m_bid_data_with_given_version = await self._get_obj_data_by_version(bid_id, version)
         m_bid_data_with_last_version = await self._get_obj_data_with_last_version_by_id(bid_id)
-        m_new_bid_data = MBidData(
+        check_expected_version(
+            m_bid_data_with_last_version.version, await self.get_bid_etag(bid_id), expected_version
+        )
+        # описание не копируется: новая версия ссылается на уже сохраненный текст
+        m_new_bid_data = await self._add_obj_to_obj_data_db(
             bid_id=bid_id,
             version=m_bid_data_with_last_version.version + 1,
             name=m_bid_data_with_given_version.name,
             description=m_bid_data_with_given_version.description,
+            stored_description=self._stored_text_columns(m_bid_data_with_given_version),
         )
-        self.db.add(m_new_bid_data)
-        await self.db.commit()
-        return await self.get_response_schema(bid_data=m_new_bid_data, bid_id=bid_id)
+        m_bid = await self._set_current_data(await self._get_obj_by_id(bid_id), m_new_bid_data)
+        return await self.get_response_schema(bid=m_bid, bid_data=m_new_bid_data)
 
     # async def raise_exception_if_forbidden(
     #         self,
@@ -343,48 +558,40 @@ class BidDAO(BidCRUD, OrganizationCRUD, EmployeeCRUD):
             )
 
         # проверить, что автор реально сделал предложение которое связано с тендером
-        bids_connected_to_tender: List[SBindRead] = await self.get_bids_by_kwargs(
-            username=requester_username,
-            tender_id=tender_id
-        )
-
-        def check_is_author_create_bit_for_tender(bids_connected_to_tender: List[SBindRead], user_id: UUID):
-            for bid in bids_connected_to_tender:
-                if bid.authorType == BidAuthorType.user and bid.authorId == user_id:
-                    return True
-            return False
-
-        if not check_is_author_create_bit_for_tender(bids_connected_to_tender, m_author.id):
+        author_bid_for_tender_exists = await self.db.execute(select(exists().where(
+            MBid.tender_id == tender_id,
+            MBid.author_type == BidAuthorType.user,
+            MBid.author_id == m_author.id,
+        )))
+        if not author_bid_for_tender_exists.scalar_one():
             raise HTTPException(
                 status_code=400,
                 detail=f"User {author_username} did not create bids for tender with {tender_id=}"
             )
-        # есть автор
-        # он когда-то делал предложения
-        # нахоим все его предложения
-        # находим все отзывы на такие предложения
+
+        # все отзывы на все предложения автора одним запросом
         query = (
-            select(MBid).
+            select(MBidFeedback.id, MBidFeedback.feedback, MBidFeedback.created_at).
+            join(MBid, MBid.id == MBidFeedback.bid_id).
             where(MBid.author_type == BidAuthorType.user).
-            where(MBid.author_id == m_author.id)
+            where(MBid.author_id == m_author.id).
+            order_by(MBidFeedback.created_at, MBidFeedback.id).
+            offset(offset).
+            limit(limit)
         )
-        feedbacks = []
-        m_bids = await self.db.execute(query)
-        m_bids = m_bids.scalars()
-        for m_bid in m_bids:
-            feedback = await self.db.execute(select(MBidFeedback).where(MBidFeedback.bid_id == m_bid.id))
-            feedback = feedback.scalars()
-            for f in feedback:
-                if f:
-                    feedbacks.append({
-                        'id': f.id,
-                        'description': f.feedback,
-                        'createdAt': f.created_at,
-                    })
-        return feedbacks[offset:offset + limit]
+        return [
+            {
+                'id': feedback_id,
+                'description': feedback,
+                'createdAt': created_at,
+            }
+            for feedback_id, feedback, created_at in await self.db.execute(query)
+        ]
 
     async def submit_decision(self, bidId: UUID, decision: BidDecision, username: str):
-        m_bid = await self._get_obj_by_id(bid_id=bidId)
+        # строка предложения блокируется до конца транзакции и перечитывается: решения по одному предложению
+        # применяются по очереди, а счетчики не устаревают из-за загрузки до блокировки
+        m_bid = await self._lock_obj_by_id(bid_id=bidId)
         m_user = await self._get_employee_by_username(username=username)
         is_responsible = await self.user_is_responsible_of_tender_related_to_bid(m_bid=m_bid, m_user=m_user)
         if not is_responsible:
@@ -393,44 +600,50 @@ class BidDAO(BidCRUD, OrganizationCRUD, EmployeeCRUD):
                 detail=f'The user with {username=} does not have access to this operation.'
             )
         # проверить, чтобы один пользователь не могу добавить несколько решение
-        decisions_of_user_to_this_bid = await self.db.execute(select(MBidDecision).where(MBidDecision.employee_id == m_user.id))
-        decisions_of_user_to_this_bid = decisions_of_user_to_this_bid.scalars().all()
-        if len(decisions_of_user_to_this_bid) == 0:
+        user_already_decided = await self.db.execute(
+            select(exists().where(MBidDecision.bid_id == bidId, MBidDecision.employee_id == m_user.id))
+        )
+        if not user_already_decided.scalar_one():
             await self._add_to_db(MBidDecision(
                 bid_id=bidId,
                 employee_id=m_user.id,
                 decision=decision,
             ))
-            await self.submit_decision_to_tender(bid_id=bidId)
+            counter = MBid.approved_count if decision == BidDecision.approved else MBid.rejected_count
+            counters = await self.db.execute(
+                update(MBid).
+                where(MBid.id == bidId).
+                values({counter: counter + 1}).
+                returning(MBid.approved_count, MBid.rejected_count)
+            )
+            approved_count, rejected_count = counters.one()
+            await self.submit_decision_to_tender(
+                bid_id=bidId, approved_count=approved_count, rejected_count=rejected_count
+            )
         return await self.get_response_schema(bid=m_bid)
 
-    async def submit_decision_to_tender(self, bid_id: UUID):
+    async def submit_decision_to_tender(self, bid_id: UUID, approved_count: int, rejected_count: int):
+        """
+        Применение кворума по счетчикам решений (значения из UPDATE ... RETURNING под блокировкой строки):
+        любое отклонение отменяет предложение, min(3, число ответственных) одобрений закрывают тендер
+        """
         m_bid = await self._get_obj_by_id(bid_id=bid_id)
-        query = select(MBidDecision).where(MBidDecision.bid_id == bid_id)
-        query_approved = query.where(MBidDecision.decision == BidDecision.approved)
-        query_rejected = query.where(MBidDecision.decision == BidDecision.rejected)
 
-        decisions_rejected = (await self.db.execute(query_rejected)).scalars().all()
-        if len(decisions_rejected) > 0:
+        if rejected_count > 0:
             m_bid.status = BidStatus.canceled
-            await self.db.commit()
+            await self.db.flush()
             return
 
-        decisions_approved = (await self.db.execute(query_approved)).scalars().all()
-        approved_counter = len(decisions_approved)
-
         tender_id = m_bid.tender_id
         m_tender = await self.get_tender_by_id(tender_id=tender_id)
         organization_id = m_tender.organization_id
-        query_organisation = select(MOrganizationResponsible).where(
-            MOrganizationResponsible.organization_id == organization_id)
-        organisation_responsible_counter = len((await self.db.execute(query_organisation)).scalars().all())
+        organisation_responsible_counter = len(await self.get_responsible_user_ids(organization_id))
 
         min_approved_count = min(3, organisation_responsible_counter)
 
-        if approved_counter >= min_approved_count:
+        if approved_count >= min_approved_count:
             m_tender.status = TenderStatus.closed
-            await self.db.commit()
+            await self.db.flush()
             return
 
     async def raise_exception_if_forbidden(self, username, bid_id):
@@ -1,8 +1,9 @@
 import uuid
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, ForeignKey, func, TIMESTAMP, UUID
+from sqlalchemy import Column, Integer, String, ForeignKey, func, TIMESTAMP, UUID, Index, UniqueConstraint, CheckConstraint
 
+from src.api.text_blobs.models import stored_text_property
 from src.database.database import Base
 
 
@@ -24,28 +25,58 @@ class BidDecision(str, Enum):
 
 class MBid(Base):
     __tablename__ = 'bid'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_bid_tender_id', 'tender_id'),
+        Index('ix_bid_author_type_author_id', 'author_type', 'author_id'),
+        Index('ix_bid_current_data_id', 'current_data_id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     status = Column(String, nullable=False)
     tender_id = Column(UUID(as_uuid=True), ForeignKey('tender.id'), nullable=False)
     author_type = Column(String, nullable=False)
     author_id = Column(UUID(as_uuid=True), nullable=False)
+    # счетчики решений из bid_decision, обновляются в той же транзакции, что и вставка решения
+    approved_count = Column(Integer, nullable=False, default=0, server_default='0')
+    rejected_count = Column(Integer, nullable=False, default=0, server_default='0')
+    # указатель на строку bid_data с текущей (последней) версией
+    current_data_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('bid_data.id', use_alter=True, name='fk_bid_current_data_id'),
+        nullable=True,
+    )
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
 
 class MBidData(Base):
     __tablename__ = 'bid_data'
+    __table_args__ = (
+        UniqueConstraint('bid_id', 'version', name='uq_bid_data_bid_id_version'),
+        CheckConstraint(
+            'description IS NOT NULL OR description_hash IS NOT NULL', name='ck_bid_data_description_stored'
+        ),
+        Index('ix_bid_data_description_hash', 'description_hash'),
+        # GIN-индексы для поиска (to_tsvector, pg_trgm) есть только в PostgreSQL и создаются миграцией 0006
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bid_id = Column(UUID(as_uuid=True), ForeignKey('bid.id'), nullable=False)
     version = Column(Integer, nullable=False)
     name = Column(String, nullable=False)
-    description = Column(String, nullable=False)
+    # описание хранится либо в строке (description), либо в text_blob (description_hash), см. TextBlobCRUD
+    description_text = Column('description', String, nullable=True)
+    description_hash = Column(String(64), ForeignKey('text_blob.hash'), nullable=True)
+    description = stored_text_property(description_text, description_hash)
 
 
 class MBidFeedback(Base):
     __tablename__ = 'bid_feedback'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_bid_feedback_bid_id', 'bid_id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bid_id = Column(UUID(as_uuid=True), ForeignKey('bid.id'), nullable=False)
@@ -55,6 +86,10 @@ class MBidFeedback(Base):
 
 class MBidDecision(Base):
     __tablename__ = 'bid_decision'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_bid_decision_bid_id_employee_id', 'bid_id', 'employee_id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bid_id = Column(UUID(as_uuid=True), ForeignKey('bid.id'), nullable=False)
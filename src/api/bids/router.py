@@ -1,10 +1,15 @@
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response
 
 from src.api.bids.dao import BidDAO
 from src.api.bids.models import BidStatus, BidDecision
-from src.api.bids.schemas import SBindCreate, SBindUpdate, SReviewRequest
+from src.api.bids.schemas import SBindCreate, SBindUpdate, SReviewRequest, SBindBulkResult
+from src.api.etag import ETAG_HEADER, conditional_response, items_etag, page_not_modified
+from src.api.schemas import SVersionHistory
+from src.api.pagination import set_next_cursor
+from src.api.versions import parse_expected_version
 
 router = APIRouter(
     prefix="/api",
@@ -20,73 +25,165 @@ async def create_bid(
     return await dao.create_bid(bid)
 
 
+@router.post("/bids/bulk")
+async def create_bids_bulk(
+        bids: List[SBindCreate] = Body(..., max_length=10000),
+        dao: BidDAO = Depends()
+) -> List[SBindBulkResult]:
+    """
+    Создание пачки предложений в одной транзакции. Для каждого элемента возвращается созданное предложение или ошибка.
+    """
+    return await dao.create_bids_bulk(bids)
+
+
 @router.get("/bids/my")
 async def get_bids_by_user(
+        request: Request,
+        response: Response,
         username: str,
         limit: int = Query(5, ge=0),
         offset: int = Query(0, ge=0),
+        after: Optional[str] = None,
+        q: Optional[str] = Query(None, min_length=1),
         dao: BidDAO = Depends()
 ):
-    return await dao.get_bids_by_kwargs(
-        limit=limit,
-        offset=offset,
-        username=username
+    """
+    Для keyset-пагинации передайте в after значение заголовка X-Next-Cursor предыдущей страницы.
+    q - поиск по названию и описанию с сортировкой по релевантности (только с offset-пагинацией).
+    """
+    page = dict(limit=limit, offset=offset, username=username, after=after, q=q)
+    not_modified = await page_not_modified(
+        request, response, lambda: dao.get_bids_page_keys(**page), limit, with_cursor=not q
     )
+    if not_modified:
+        return not_modified
+    bids = await dao.get_bids_by_kwargs(**page)
+    if not q:
+        set_next_cursor(response, bids, limit)
+    return conditional_response(request, response, items_etag(bids)) or bids
 
 
 @router.get("/bids/{tenderId}/list")
 async def get_bids_by_tender_id(
+        request: Request,
+        response: Response,
         username: str,
         tenderId: UUID,
         limit: int = Query(5, ge=0),
         offset: int = Query(0, ge=0),
+        after: Optional[str] = None,
+        q: Optional[str] = Query(None, min_length=1),
         dao: BidDAO = Depends()
 ):
-    return await dao.get_bids_by_kwargs(
-        limit=limit,
-        offset=offset,
-        username=username,
-        tender_id=tenderId
+    """
+    Для keyset-пагинации передайте в after значение заголовка X-Next-Cursor предыдущей страницы.
+    q - поиск по названию и описанию с сортировкой по релевантности (только с offset-пагинацией).
+    """
+    page = dict(limit=limit, offset=offset, username=username, tender_id=tenderId, after=after, q=q)
+    not_modified = await page_not_modified(
+        request, response, lambda: dao.get_bids_page_keys(**page), limit, with_cursor=not q
     )
+    if not_modified:
+        return not_modified
+    bids = await dao.get_bids_by_kwargs(**page)
+    if not q:
+        set_next_cursor(response, bids, limit)
+    return conditional_response(request, response, items_etag(bids)) or bids
 
 
 @router.get("/bids/{bidId}/status")
 async def get_bid_status_by_id(
+        request: Request,
+        response: Response,
         bidId: UUID,
         username: str,
         dao: BidDAO = Depends()
 ):
-    return await dao.get_bid_status_by_id(bidId, username)
+    """
+    Поддерживает условный GET: при совпадении If-None-Match с ETag возвращается 304 без тела.
+    """
+    status = await dao.get_bid_status_by_id(bidId, username)
+    return conditional_response(request, response, await dao.get_bid_etag(bidId)) or status
 
 
 @router.put("/bids/{bidId}/status")
 async def change_bid_status_by_id(
+        response: Response,
         bidId: UUID,
         status: BidStatus,
         username: str,
         dao: BidDAO = Depends()
 ):
-    return await dao.change_bid_status_by_id(bidId, status, username)
+    """
+    В заголовке ETag возвращается новый ETag предложения (для If-Match и If-None-Match).
+    """
+    bid = await dao.change_bid_status_by_id(bidId, status, username)
+    response.headers[ETAG_HEADER] = await dao.get_bid_etag(bidId)
+    return bid
 
 
 @router.patch("/bids/{bidId}/edit")
 async def edit_bid(
+        response: Response,
         bidId: UUID,
         bid_update_data: SBindUpdate,
         username: str,
+        if_match: Optional[str] = Header(None, alias='If-Match'),
         dao: BidDAO = Depends()
 ):
-    return await dao.update_bid_by_id(bidId, bid_update_data, username)
+    """
+    В If-Match можно передать ожидаемую текущую версию или ETag предложения: если предложение уже изменили,
+    вернется 412. В заголовке ETag возвращается новый ETag предложения.
+    """
+    bid = await dao.update_bid_by_id(bidId, bid_update_data, username, expected_version=parse_expected_version(if_match))
+    response.headers[ETAG_HEADER] = await dao.get_bid_etag(bidId)
+    return bid
+
+
+@router.get("/bids/{bidId}/versions")
+async def get_bid_versions(
+        bidId: UUID,
+        username: str,
+        fromVersion: int = Query(1, ge=1),
+        toVersion: Optional[int] = Query(None, ge=1),
+        limit: int = Query(100, ge=1, le=1000),
+        fields: Optional[str] = None,
+        diffFrom: Optional[int] = Query(None, ge=1),
+        diffTo: Optional[int] = Query(None, ge=1),
+        dao: BidDAO = Depends()
+) -> SVersionHistory:
+    """
+    Версии с fromVersion по toVersion (не больше limit) одним запросом.
+    fields - поля версий через запятую; diffFrom и diffTo - посчитать на сервере diff между двумя версиями.
+    """
+    return await dao.get_bid_versions(
+        bidId,
+        username,
+        from_version=fromVersion,
+        to_version=toVersion,
+        limit=limit,
+        fields=fields,
+        diff_from=diffFrom,
+        diff_to=diffTo,
+    )
 
 
 @router.put("/bids/{bidId}/rollback/{version}")
 async def rollback_bid(
+        response: Response,
         bidId: UUID,
         version: int,
         username: str,
+        if_match: Optional[str] = Header(None, alias='If-Match'),
         dao: BidDAO = Depends()
 ):
-    return await dao.rollback_bid(bidId, version, username)
+    """
+    В If-Match можно передать ожидаемую текущую версию или ETag предложения: если предложение уже изменили,
+    вернется 412. В заголовке ETag возвращается новый ETag предложения.
+    """
+    bid_data = await dao.rollback_bid(bidId, version, username, expected_version=parse_expected_version(if_match))
+    response.headers[ETAG_HEADER] = await dao.get_bid_etag(bidId)
+    return bid_data
 
 
 @router.put("/bids/{bidId}/feedback")
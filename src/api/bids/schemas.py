@@ -4,6 +4,7 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from src.api.bids.models import BidStatus, BidAuthorType
+from src.api.schemas import SBulkError
 
 
 class SBindCreate(BaseModel):
@@ -24,6 +25,12 @@ class SBindRead(BaseModel):
     createdAt: datetime
 
 
+class SBindBulkResult(BaseModel):
+    index: int
+    bid: SBindRead | None = None
+    error: SBulkError | None = None
+
+
 class SBindUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
@@ -1,15 +1,56 @@
+import functools
+import inspect
+
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.database import get_db
 
 
+def request_cached(namespace: str):
+    """
+    Кэширование результата метода DAO на время запроса.
+    Кэш хранится в сессии (сессия создается на каждый запрос в get_db), поэтому он общий для всех DAO-миксинов
+    и всех DAO, работающих в рамках одного запроса. Ключ: namespace + значения аргументов метода.
+    Исключения (например 404) не кэшируются.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            key = (namespace, *list(arguments.arguments.values())[1:])
+            cache = self._request_cache
+            if key not in cache:
+                cache[key] = await method(self, *args, **kwargs)
+            return cache[key]
+
+        return wrapper
+
+    return decorator
+
+
 class DAO:
-    def __init__(self, db=Depends(get_db)):
+    def __init__(self, db=Depends(get_db, scope='function')):
         self.db: AsyncSession = db
 
+    @property
+    def _request_cache(self) -> dict:
+        return self.db.info.setdefault('request_cache', {})
+
+    def _set_request_cached(self, namespace: str, *args, value) -> None:
+        """
+        Положить значение в кэш запроса под тем же ключом, что и request_cached (namespace + аргументы метода)
+        """
+        self._request_cache[(namespace, *args)] = value
+
     async def _add_to_db(self, obj):
+        """
+        Запись объекта в рамках транзакции запроса (коммит делает get_db после обработчика).
+        Серверные значения по умолчанию возвращаются INSERT ... RETURNING (eager_defaults у моделей).
+        """
         self.db.add(obj)
-        await self.db.commit()
-        await self.db.refresh(obj)
-        return obj
\ No newline at end of file
+        await self.db.flush()
+        return obj
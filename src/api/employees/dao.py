@@ -1,25 +1,44 @@
+from typing import Iterable
 from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy import select
 
-from src.api.dao import DAO
+from src.api.dao import DAO, request_cached
 from src.api.employees.models import MEmployee
+from src.database.routing import remember_usernames
 
 
 class EmployeeCRUD(DAO):
     crud_model = MEmployee
 
+    @request_cached('employee_by_username')
     async def _get_employee_by_username(self, username: str) -> MEmployee:
         m_employee = await self.db.execute(select(MEmployee).filter_by(username=username))
         m_employee = m_employee.scalar_one_or_none()
         if not m_employee:
             raise HTTPException(status_code=404, detail=f"Employee with username {username} not found.")
+        remember_usernames(self.db, [username])
         return m_employee
 
+    @request_cached('employee_by_id')
     async def _get_employee_by_id(self, id: UUID) -> MEmployee:
         m_employee = await self.db.execute(select(MEmployee).filter_by(id=id))
         m_employee = m_employee.scalar_one_or_none()
         if not m_employee:
             raise HTTPException(status_code=404, detail=f"Employee with id={id} not found.")
+        remember_usernames(self.db, [m_employee.username])
         return m_employee
+
+    async def _get_employee_ids_by_usernames(self, usernames: Iterable[str]) -> dict[str, UUID]:
+        """
+        username -> id для существующих сотрудников (одним запросом)
+        """
+        query = select(MEmployee.username, MEmployee.id).where(MEmployee.username.in_(set(usernames)))
+        employee_ids = {username: id for username, id in await self.db.execute(query)}
+        remember_usernames(self.db, employee_ids)
+        return employee_ids
+
+    async def _get_existing_employee_ids(self, ids: Iterable[UUID]) -> set[UUID]:
+        query = select(MEmployee.id).where(MEmployee.id.in_(set(ids)))
+        return set((await self.db.execute(query)).scalars())
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Awaitable, Callable, Sequence
+
+from fastapi import Request, Response
+
+from src.api.pagination import set_next_cursor
+
+ETAG_HEADER = 'ETag'
+
+
+def make_etag(*parts) -> str:
+    """
+    Строгий ETag: хэш от частей, которые однозначно определяют представление ресурса.
+    Enum приводится к значению: статус из запроса - Enum, а загруженный из БД - str
+    """
+    raw = '|'.join(str(getattr(part, 'value', part)) for part in parts).encode()
+    return f'"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+
+
+def items_etag(items: Sequence) -> str:
+    """
+    ETag страницы списка: (id, version, status) элементов однозначно определяют тело ответа,
+    так как остальные поля хранятся в неизменяемой версии. Элементы - схемы ответа или строки с ключами страницы
+    """
+    return make_etag(*(part for item in items for part in (item.id, item.version, item.status)))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # для If-None-Match используется слабое сравнение: префикс W/ не учитывается
+    return etag in (tag.strip().removeprefix('W/') for tag in header.split(','))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Проставляет ETag в ответ. Если у клиента уже актуальная версия (If-None-Match), возвращает пустой 304,
+    который обработчик должен отдать вместо тела. В 304 копируются заголовки, уже проставленные в response
+    (например X-Next-Cursor)
+    """
+    response.headers[ETAG_HEADER] = etag
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+
+async def page_not_modified(
+        request: Request,
+        response: Response,
+        load_page_keys: Callable[[], Awaitable[Sequence]],
+        limit: int | None,
+        with_cursor: bool = True,
+) -> Response | None:
+    """
+    Условный GET для страницы списка. Если клиент прислал If-None-Match, ETag и курсор считаются по ключам строк
+    страницы (load_page_keys: id, version, status, name) одним легким запросом, и при совпадении сразу
+    возвращается 304. Иначе None: обработчик загружает страницу целиком
+    """
+    if not request.headers.get('if-none-match'):
+        return None
+    page_keys = await load_page_keys()
+    if with_cursor:
+        set_next_cursor(response, page_keys, limit)
+    return conditional_response(request, response, items_etag(page_keys))
@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from src.api.organisations.models import MOrganizationResponsible
+from src.settings import settings
+
+
+class ResponsibleCache:
+    """
+    Процессный LRU-кэш с TTL: organization_id -> frozenset id пользователей, ответственных за организацию.
+    Сбрасывается явно через invalidate() и автоматически после коммита изменений в organization_responsible.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # растет при каждом сбросе, чтобы не сохранить в кэш данные, прочитанные до сброса
+        self.generation = 0
+        self._data: OrderedDict[UUID, tuple[float, frozenset[UUID]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, organization_id: UUID) -> frozenset[UUID] | None:
+        item = self._data.get(organization_id)
+        if item is None or item[0] < time.monotonic():
+            self._data.pop(organization_id, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(organization_id)
+        self.hits += 1
+        return item[1]
+
+    def set(self, organization_id: UUID, user_ids: frozenset[UUID], generation: int) -> None:
+        """
+        generation - значение self.generation, снятое до чтения user_ids из БД
+        """
+        if generation != self.generation:
+            return
+        self._data[organization_id] = (time.monotonic() + self.ttl, user_ids)
+        self._data.move_to_end(organization_id)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, organization_id: UUID | None = None) -> None:
+        """
+        Сброс записи для организации или всего кэша (organization_id=None)
+        """
+        self.generation += 1
+        if organization_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(organization_id, None)
+
+
+responsible_cache = ResponsibleCache(
+    max_size=settings.responsible_cache_size,
+    ttl=settings.responsible_cache_ttl,
+)
+
+_PENDING_INVALIDATION_KEY = 'responsible_cache_invalidate'
+
+
+@event.listens_for(MOrganizationResponsible, 'after_insert')
+@event.listens_for(MOrganizationResponsible, 'after_update')
+@event.listens_for(MOrganizationResponsible, 'after_delete')
+def _mark_organization_changed(mapper, connection, target: MOrganizationResponsible):
+    session = object_session(target)
+    if session is not None:
+        # при смене organization_id у существующей записи затронуты две организации - сбрасываем все
+        organization_id = None if inspect(target).attrs.organization_id.history.deleted else target.organization_id
+        session.info.setdefault(_PENDING_INVALIDATION_KEY, set()).add(organization_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session):
+    for organization_id in session.info.pop(_PENDING_INVALIDATION_KEY, ()):
+        responsible_cache.invalidate(organization_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_INVALIDATION_KEY, None)
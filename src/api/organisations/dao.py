@@ -1,15 +1,18 @@
+from typing import Iterable
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, exists
 
-from src.api.dao import DAO
+from src.api.dao import DAO, request_cached
+from src.api.organisations.cache import responsible_cache
 from src.api.organisations.models import MOrganization, MOrganizationResponsible
 
 
 class OrganizationCRUD(DAO):
     crud_model = MOrganization
 
+    @request_cached('organization')
     async def _get_organisation_by_id(self, organization_id: UUID) -> MOrganization:
         m_organization = await self.db.execute(select(MOrganization).where(MOrganization.id == organization_id))
         m_organization = m_organization.scalar_one_or_none()
@@ -17,12 +20,49 @@ class OrganizationCRUD(DAO):
             raise HTTPException(status_code=404, detail=f"Organization with id={organization_id} not found.")
         return m_organization
 
-    async def check_is_user_responsible(self, organization_id: UUID, user_id: UUID) -> bool:
+    @request_cached('responsible_user_ids')
+    async def get_responsible_user_ids(self, organization_id: UUID) -> frozenset[UUID]:
+        """
+        id пользователей, ответственных за организацию (сначала смотрим в процессный кэш responsible_cache)
+        """
+        user_ids = responsible_cache.get(organization_id)
+        if user_ids is None:
+            generation = responsible_cache.generation
+            query = (
+                select(MOrganizationResponsible.user_id).
+                where(MOrganizationResponsible.organization_id == organization_id)
+            )
+            user_ids = frozenset((await self.db.execute(query)).scalars())
+            responsible_cache.set(organization_id, user_ids, generation)
+        return user_ids
+
+    async def _get_existing_organization_ids(self, organization_ids: Iterable[UUID]) -> set[UUID]:
+        query = select(MOrganization.id).where(MOrganization.id.in_(set(organization_ids)))
+        return set((await self.db.execute(query)).scalars())
+
+    async def _get_responsible_pairs(
+            self, organization_ids: Iterable[UUID], user_ids: Iterable[UUID]
+    ) -> set[tuple[UUID, UUID]]:
+        """
+        Пары (organization_id, user_id) из переданных, в которых пользователь ответственный за организацию
+        """
         query = (
-            select(MOrganizationResponsible).
-            where(MOrganizationResponsible.organization_id == organization_id).
-            where(MOrganizationResponsible.user_id == user_id)
+            select(MOrganizationResponsible.organization_id, MOrganizationResponsible.user_id).
+            where(MOrganizationResponsible.organization_id.in_(set(organization_ids))).
+            where(MOrganizationResponsible.user_id.in_(set(user_ids)))
+        )
+        return {(organization_id, user_id) for organization_id, user_id in await self.db.execute(query)}
+
+    async def check_is_user_responsible(self, organization_id: UUID, user_id: UUID) -> bool:
+        return user_id in await self.get_responsible_user_ids(organization_id)
+
+    @staticmethod
+    def user_is_responsible_clause(organization_id, user_id: UUID):
+        """
+        SQL-условие: пользователь с id=user_id является ответственным за организацию organization_id
+        (organization_id может быть колонкой внешнего запроса)
+        """
+        return exists().where(
+            MOrganizationResponsible.organization_id == organization_id,
+            MOrganizationResponsible.user_id == user_id,
         )
-        if not (await self.db.execute(query)).scalar_one_or_none():
-            return False
-        return True
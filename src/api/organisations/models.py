@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, UUID
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, UUID, Index
 
 from src.database.database import Base
 
@@ -43,6 +43,9 @@ class MOrganizationResponsible(Base):
     );
     """
     __tablename__ = 'organization_responsible'
+    __table_args__ = (
+        Index('ix_organization_responsible_organization_id_user_id', 'organization_id', 'user_id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # id = Column(Integer, primary_key=True)
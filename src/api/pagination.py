@@ -0,0 +1,41 @@
+import base64
+import json
+from typing import Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(name: str, id: UUID) -> str:
+    """
+    Непрозрачный курсор для keyset-пагинации: позиция (name, id) последнего элемента страницы
+    """
+    raw = json.dumps([name, str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, UUID]:
+    try:
+        name, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return name, UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid pagination cursor {cursor!r}.")
+
+
+def after_cursor_clause(name_column, id_column, cursor: str):
+    """
+    SQL-условие: строка идет строго после позиции курсора в порядке сортировки (name, id)
+    """
+    name, id = decode_cursor(cursor)
+    return tuple_(name_column, id_column) > tuple_(name, id, types=[name_column.type, id_column.type])
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int | None) -> None:
+    """
+    Если страница заполнена целиком, отдает курсор на следующую страницу в заголовке X-Next-Cursor
+    """
+    if items and limit and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].name, items[-1].id)
@@ -0,0 +1,126 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from fastapi import Request, Response
+
+from src.api.etag import ETAG_HEADER, etag_matches
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    Готовое тело ответа (JSON) и его заголовки: при попадании в кэш ответ отдается без запросов в БД и сериализации
+    """
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, ETAG_HEADER: self.etag}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type='application/json', headers=headers)
+
+
+class ResponseCacheBackend(ABC):
+    """
+    Хранилище кэша ответов. Методы асинхронные, чтобы за интерфейсом можно было поставить внешнее хранилище
+    (Redis, memcached), сериализующее CachedResponse.
+    Поколение кэша (см. ResponseCache.make_key) тоже хранится в хранилище, чтобы сброс в одном процессе
+    был виден всем процессам с общим хранилищем: во внешнем хранилище это счетчик с атомарным
+    увеличением (например INCR в Redis)
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def get_generation(self) -> int:
+        ...
+
+    @abstractmethod
+    async def incr_generation(self) -> int:
+        ...
+
+
+class InMemoryResponseCacheBackend(ResponseCacheBackend):
+    """
+    Процессный LRU с TTL (хранилище по умолчанию)
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.generation = 0
+        self._data: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    async def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def get_generation(self) -> int:
+        return self.generation
+
+    async def incr_generation(self) -> int:
+        self.generation += 1
+        return self.generation
+
+
+class ResponseCache:
+    """
+    Кэш готовых ответов поверх ResponseCacheBackend со счетчиками попаданий для метрик.
+    Сбрасывается целиком через invalidate(): списки зависят от множества строк, поэтому точечный сброс не нужен.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def make_key(self, *parts) -> str:
+        """
+        Поколение из хранилища входит в ключ: после сброса старые записи становятся недоступны и вытесняются
+        по LRU/TTL, а ответ, прочитанный из БД до сброса, сохраняется под старым ключом и никому не отдается.
+        Поэтому ключ нужно получить до чтения из БД
+        """
+        generation = await self.backend.get_generation() if self.enabled else 0
+        return '|'.join(map(str, (generation, *parts)))
+
+    async def get(self, key: str) -> CachedResponse | None:
+        if not self.enabled:
+            return None
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        if self.enabled:
+            await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self) -> None:
+        if self.enabled:
+            await self.backend.incr_generation()
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class SBulkError(BaseModel):
+    statusCode: int
+    detail: str
+
+
+class SVersionDiff(BaseModel):
+    fromVersion: int
+    toVersion: int
+    # поле -> unified diff, только для изменившихся полей
+    changes: dict[str, str]
+
+
+class SVersionHistory(BaseModel):
+    versions: list[dict]
+    diff: SVersionDiff | None = None
@@ -0,0 +1,56 @@
+from fastapi import HTTPException
+from sqlalchemy import String, any_, func, literal_column, or_, select
+
+from src.api.text_blobs.models import MTextBlob
+
+# конфигурация и выражения должны совпадать с индексами из миграции 0006 (GIN по to_tsvector и gin_trgm_ops),
+# поэтому константы подставляются в SQL литералами, а не параметрами
+SEARCH_CONFIG = literal_column("'simple'")
+_SEPARATOR = literal_column("' '", String)
+_EMPTY = literal_column("''", String)
+# минимальная длина q для поиска по названию через pg_trgm (индекс ищет по триграммам)
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _document(name_column, description_column):
+    return func.to_tsvector(SEARCH_CONFIG, name_column + _SEPARATOR + func.coalesce(description_column, _EMPTY))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def text_search(model, q: str):
+    """
+    Условие поиска и ранг для строк версий model (MTenderData или MBidData).
+    Совпадение: полнотекстовый поиск по названию и описанию (в строке версии или в text_blob)
+    или похожее название (pg_trgm: опечатки и подстроки). Поиск по названию только для q не короче
+    TRIGRAM_MIN_LENGTH: для более коротких строк в q нет ни одной полной триграммы, GIN-индекс pg_trgm
+    не используется, и ILIKE '%q%' прочитал бы все версии всех строк
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # = ANY(массив), а не IN (подзапрос): массив считается один раз (InitPlan) и условие идет по индексу
+    # description_hash, поэтому все ветки OR объединяются через BitmapOr по индексам вместо фильтра всех версий
+    matching_blobs = func.array(select(MTextBlob.hash).where(
+        func.to_tsvector(SEARCH_CONFIG, MTextBlob.content).op('@@')(tsquery)
+    ).scalar_subquery())
+    conditions = [
+        _document(model.name, model.description_text).op('@@')(tsquery),
+        model.description_hash == any_(matching_blobs),
+    ]
+    rank = func.ts_rank(_document(model.name, model.description), tsquery)
+    if len(q.strip()) >= TRIGRAM_MIN_LENGTH:
+        conditions += [
+            model.name.op('%')(q),
+            model.name.ilike(f'%{_escape_like(q)}%', escape='\\'),
+        ]
+        rank = rank + func.similarity(model.name, q)
+    return or_(*conditions), rank
+
+
+def raise_if_search_with_cursor(q: str | None, after: str | None) -> None:
+    if q and after:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor pagination (after) is not supported together with search (q); use offset.",
+        )
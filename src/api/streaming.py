@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[dict]]) -> AsyncIterator[str]:
+    """
+    NDJSON: одна строка JSON на объект, одна порция текста на пачку строк из БД
+    """
+    async for batch in batches:
+        yield ''.join(json.dumps(row, default=_json_default, ensure_ascii=False) + '\n' for row in batch)
+
+
+async def json_array_chunks(batches: AsyncIterator[Sequence[dict]]) -> AsyncIterator[str]:
+    """
+    JSON-массив объектов, одна порция текста на пачку строк из БД
+    """
+    separator = '['
+    async for batch in batches:
+        if not batch:
+            continue
+        yield separator + ','.join(json.dumps(row, default=_json_default, ensure_ascii=False) for row in batch)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+async def csv_chunks(batches: AsyncIterator[Sequence[dict]], columns: Sequence[str]) -> AsyncIterator[str]:
+    """
+    CSV с заголовком columns, одна порция текста на пачку строк из БД
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+            for row in batch
+        )
+        yield buffer.getvalue()
@@ -0,0 +1,52 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, ORMExecuteState, object_session
+
+from src.api.response_cache import ResponseCache, InMemoryResponseCacheBackend
+from src.api.tenders.models import MTender, MTenderData
+from src.database.database import call_after_commit
+from src.settings import settings
+
+# кэш ответов публичного каталога /api/tenders/ (запросы без username одинаковы для всех клиентов)
+tender_list_cache = ResponseCache(
+    backend=InMemoryResponseCacheBackend(max_size=settings.tender_list_cache_size),
+    ttl=settings.tender_list_cache_ttl,
+    enabled=settings.tender_list_cache_size > 0,
+)
+
+_PENDING_INVALIDATION_KEY = 'tender_list_cache_invalidate'
+_TENDER_MAPPERS = frozenset({MTender.__mapper__, MTenderData.__mapper__})
+
+
+@event.listens_for(MTender, 'after_insert')
+@event.listens_for(MTender, 'after_update')
+@event.listens_for(MTender, 'after_delete')
+@event.listens_for(MTenderData, 'after_insert')
+@event.listens_for(MTenderData, 'after_update')
+@event.listens_for(MTenderData, 'after_delete')
+def _mark_tender_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_INVALIDATION_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_tender_changed_by_statement(orm_execute_state: ORMExecuteState):
+    """
+    Массовые insert/update (create_tenders_bulk) идут мимо unit of work и не вызывают события маппера
+    """
+    if (
+            (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete)
+            and orm_execute_state.bind_mapper in _TENDER_MAPPERS
+    ):
+        orm_execute_state.session.info[_PENDING_INVALIDATION_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session: Session):
+    if session.info.pop(_PENDING_INVALIDATION_KEY, False):
+        call_after_commit(session, tender_list_cache.invalidate)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_INVALIDATION_KEY, None)
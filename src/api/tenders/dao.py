@@ -1,16 +1,26 @@
-from uuid import UUID
+from typing import AsyncIterator, List, Sequence
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
-from sqlalchemy import select, desc
-
-from src.api.dao import DAO
+from sqlalchemy import select, or_, insert, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.api.dao import request_cached
+from src.api.schemas import SBulkError, SVersionHistory
+from src.api.etag import make_etag
+from src.api.pagination import after_cursor_clause
+from src.api.search import text_search, raise_if_search_with_cursor
 from src.api.organisations.dao import OrganizationCRUD
+from src.api.text_blobs.dao import TextBlobCRUD
+from src.api.versions import (
+    get_version_history, select_version_fields, check_expected_version, ExpectedVersion,
+)
 from src.api.employees.dao import EmployeeCRUD
 from src.api.tenders.models import TenderServiceType, TenderStatus, MTender, MTenderData
-from src.api.tenders.schemas import STenderCreate, STenderRead, STenderUpdate
+from src.api.tenders.schemas import STenderCreate, STenderRead, STenderUpdate, STenderBulkResult
 
 
-class TenderCRUD(DAO):
+class TenderCRUD(TextBlobCRUD):
     async def _add_obj_to_obj_db(
             self, status: TenderStatus, organization_id: UUID
     ) -> MTender:
@@ -20,16 +30,39 @@ class TenderCRUD(DAO):
         ))
 
     async def _add_obj_to_obj_data_db(
-            self, tender_id: UUID, name: str, description: str, service_type: TenderServiceType, version: int, **kwargs
+            self,
+            tender_id: UUID,
+            name: str,
+            description: str,
+            service_type: TenderServiceType,
+            version: int,
+            stored_description: dict | None = None,
+            **kwargs
     ) -> MTenderData:
-        return await self._add_to_db(MTenderData(
+        """
+        stored_description - колонки уже сохраненного описания (см. TextBlobCRUD._stored_text_columns),
+        если описание не менялось: тогда текст повторно не записывается
+        """
+        if stored_description is None:
+            stored_description = await self._store_text(description)
+        m_tender_data = await self._add_to_db(MTenderData(
             tender_id=tender_id,
             name=name,
-            description=description,
             service_type=service_type,
             version=version,
+            **stored_description,
         ))
+        set_committed_value(m_tender_data, 'description', description)
+        return m_tender_data
+
+    async def _set_current_data(self, m_tender: MTender, m_tender_data: MTenderData) -> MTender:
+        """
+        Переключение указателя текущей версии тендера на m_tender_data
+        """
+        m_tender.current_data_id = m_tender_data.id
+        return await self._add_to_db(m_tender)
 
+    @request_cached('tender')
     async def _get_obj_by_id(self, tender_id: UUID) -> MTender:
         query = select(MTender).where(MTender.id == tender_id)
         m_tender = await self.db.execute(query)
@@ -38,12 +71,29 @@ class TenderCRUD(DAO):
             raise HTTPException(status_code=404, detail=f"Tender with id={tender_id} not found")
         return m_tender
 
+    async def _lock_obj_by_id(self, tender_id: UUID) -> MTender:
+        """
+        Загрузка тендера с блокировкой строки (SELECT ... FOR UPDATE) до конца транзакции, чтобы параллельные
+        правки одного тендера выделяли номера версий по очереди. Заменяет обычную загрузку в кэше запроса,
+        поэтому проверка прав не делает отдельный запрос
+        """
+        query = (
+            select(MTender).
+            where(MTender.id == tender_id).
+            with_for_update().
+            execution_options(populate_existing=True)
+        )
+        m_tender = (await self.db.execute(query)).scalar_one_or_none()
+        if not m_tender:
+            raise HTTPException(status_code=404, detail=f"Tender with id={tender_id} not found")
+        self._set_request_cached('tender', tender_id, value=m_tender)
+        return m_tender
+
     async def _get_obj_data_with_last_version_by_id(self, tender_id: UUID) -> MTenderData:
         query = (
             select(MTenderData).
-            where(MTenderData.tender_id == tender_id).
-            order_by(desc(MTenderData.version)).
-            limit(1)
+            join(MTender, MTender.current_data_id == MTenderData.id).
+            where(MTender.id == tender_id)
         )
         m_tender_data_with_last_version = await self.db.execute(query)
         m_tender_data_with_last_version = m_tender_data_with_last_version.scalar_one_or_none()
@@ -84,7 +134,6 @@ class TenderCRUD(DAO):
             tender = await self._get_obj_by_id(tender_id)
         if not tender_data:
             tender_data = await self._get_obj_data_with_last_version_by_id(tender_id)
-        print()
         return STenderRead(
             id=tender.id,
             name=tender_data.name,
@@ -125,65 +174,205 @@ class TenderDAO(TenderCRUD, OrganizationCRUD, EmployeeCRUD):
             service_type=tender.serviceType,
             version=1,
         )
+        m_tender = await self._set_current_data(m_tender, m_tender_data)
 
         return await self.get_response_schema(tender=m_tender, tender_data=m_tender_data)
 
-    async def update_tender_by_id(self, tender_id: UUID, tender_update_data: STenderUpdate, username: str):
-        # проверка прав доступа
+    async def create_tenders_bulk(self, tenders: List[STenderCreate]) -> List[STenderBulkResult]:
+        """
+        Создание пачки тендеров в одной транзакции.
+        Проверки выполняются на всю пачку несколькими запросами с IN (...), строки tender и tender_data
+        вставляются многострочными INSERT ... RETURNING. Результат (тендер или ошибка) отдается для каждого элемента.
+        """
+        organization_ids = await self._get_existing_organization_ids(t.organizationId for t in tenders)
+        employee_ids = await self._get_employee_ids_by_usernames(t.creatorUsername for t in tenders)
+        responsible_pairs = await self._get_responsible_pairs(
+            organization_ids=organization_ids,
+            user_ids=employee_ids.values(),
+        )
+
+        results = [STenderBulkResult(index=index) for index in range(len(tenders))]
+        valid = []
+        for index, tender in enumerate(tenders):
+            if tender.organizationId not in organization_ids:
+                error = SBulkError(statusCode=404, detail=f"Organization with id={tender.organizationId} not found.")
+            elif tender.creatorUsername not in employee_ids:
+                error = SBulkError(statusCode=404, detail=f"Employee with username {tender.creatorUsername} not found.")
+            elif (tender.organizationId, employee_ids[tender.creatorUsername]) not in responsible_pairs:
+                error = SBulkError(
+                    statusCode=403,
+                    detail=f"User {tender.creatorUsername} is not responsible for tender creation",
+                )
+            else:
+                valid.append((index, tender))
+                continue
+            results[index].error = error
+        if not valid:
+            return results
+
+        # id генерируются заранее, чтобы связать tender, tender_data и указатель на текущую версию без лишних запросов
+        tender_rows = [
+            {'id': uuid4(), 'status': TenderStatus.created, 'organization_id': tender.organizationId}
+            for _, tender in valid
+        ]
+        stored_descriptions = await self._store_texts(tender.description for _, tender in valid)
+        tender_data_rows = [
+            {
+                'id': uuid4(),
+                'tender_id': tender_row['id'],
+                'name': tender.name,
+                'service_type': tender.serviceType,
+                'version': 1,
+                **stored_description,
+            }
+            for tender_row, (_, tender), stored_description in zip(tender_rows, valid, stored_descriptions)
+        ]
+        created = await self.db.execute(
+            insert(MTender).returning(MTender.created_at, sort_by_parameter_order=True),
+            tender_rows,
+        )
+        created_at = created.scalars().all()
+        await self.db.execute(insert(MTenderData), tender_data_rows)
+        await self.db.execute(update(MTender), [
+            {'id': tender_row['id'], 'current_data_id': tender_data_row['id']}
+            for tender_row, tender_data_row in zip(tender_rows, tender_data_rows)
+        ])
+
+        for (index, tender), tender_row, tender_created_at in zip(valid, tender_rows, created_at):
+            results[index].tender = STenderRead(
+                id=tender_row['id'],
+                name=tender.name,
+                description=tender.description,
+                status=TenderStatus.created,
+                serviceType=tender.serviceType,
+                version=1,
+                createdAt=tender_created_at,
+            )
+        return results
+
+    async def update_tender_by_id(
+            self,
+            tender_id: UUID,
+            tender_update_data: STenderUpdate,
+            username: str,
+            expected_version: ExpectedVersion | None = None,
+    ):
+        # блокировка тендера до конца транзакции и проверка прав доступа
+        await self._lock_obj_by_id(tender_id)
         await self.raise_exception_if_forbidden(username=username, tender_id=tender_id)
 
         # получение данных последней версии по тендеру
         m_tender_data_with_last_version = await self._get_obj_data_with_last_version_by_id(tender_id)
+        check_expected_version(
+            m_tender_data_with_last_version.version, await self.get_tender_etag(tender_id), expected_version
+        )
 
         # обновление данных тендера
-        new_tender_data = {**m_tender_data_with_last_version.__dict__}
+        new_tender_data = {
+            'tender_id': tender_id,
+            'name': m_tender_data_with_last_version.name,
+            'description': m_tender_data_with_last_version.description,
+            'service_type': m_tender_data_with_last_version.service_type,
+            'version': m_tender_data_with_last_version.version + 1,
+            'stored_description': self._stored_text_columns(m_tender_data_with_last_version),
+        }
         for key, value in tender_update_data.model_dump(exclude_unset=True).items():
             if key == 'serviceType':  # тупо решение, но не успеваю переделать
                 key = 'service_type'
+            if key == 'description':
+                new_tender_data['stored_description'] = None
             new_tender_data[key] = value
-        new_tender_data['version'] += 1
-
 
         # добавление новых данных в БД версий тендера
         m_new_tender_data = await self._add_obj_to_obj_data_db(**new_tender_data)
+        m_tender = await self._set_current_data(await self._get_obj_by_id(tender_id), m_new_tender_data)
 
-        return await self.get_response_schema(tender_id=tender_id, tender_data=m_new_tender_data)
+        return await self.get_response_schema(tender=m_tender, tender_data=m_new_tender_data)
 
-    async def get_tenders_by_kwargs(self, **kwargs):
+    PAGE_KEY_COLUMNS = (MTender.id, MTenderData.version, MTender.status, MTenderData.name)
+
+    async def _tenders_page_query(self, columns, **kwargs):
         service_type: TenderServiceType | None = kwargs.get('service_type', None)
         limit: int | None = kwargs.get('limit', None)
         offset: int | None = kwargs.get('offset', None)
         username: str | None = kwargs.get('username', None)
+        after: str | None = kwargs.get('after', None)
+        q: str | None = kwargs.get('q', None)
+        raise_if_search_with_cursor(q=q, after=after)
 
-        query = select(MTender)
-        m_tenders = await self.db.execute(query)
-        m_tenders = m_tenders.scalars()
+        # фильтрация, сортировка и пагинация выполняются одним запросом в БД
+        query = (
+            select(*columns).
+            join(MTenderData, MTenderData.id == MTender.current_data_id)
+        )
 
-        tender_schemas = []
-        for m_tender in m_tenders:
-            m_tender_data = await self._get_obj_data_with_last_version_by_id(m_tender.id)
+        # фильтер на service_type
+        if service_type:
+            query = query.where(MTenderData.service_type == service_type)
 
-            # фильтер на service_type
-            if service_type and m_tender_data.service_type != service_type:
-                continue
+        # фильтер на права доступа
+        # показать тендер если пользователь ответственный за организацию или есть статус тендера == Published
+        if username:
+            m_employee = await self._get_employee_by_username(username=username)
+            query = query.where(or_(
+                MTender.status == TenderStatus.published,
+                self.user_is_responsible_clause(organization_id=MTender.organization_id, user_id=m_employee.id),
+            ))
 
-            # фильтер на права доступа
-            # показать тендер если пользователь ответственный за организацию или есть статус тендера == Published
-            if username:
-                is_responsible = await self.check_is_user_responsible(
-                    organization_id=m_tender.organization_id,
-                    user_id=(await self._get_employee_by_username(username=username)).id
-                )
-                tender_status = m_tender.status
-                if not (is_responsible or tender_status == TenderStatus.published):
-                    continue
+        # keyset-пагинация: строки строго после курсора (name, id) предыдущей страницы
+        if after:
+            query = query.where(after_cursor_clause(MTenderData.name, MTender.id, after))
 
-            tender_schemas.append(
-                await self.get_response_schema(tender=m_tender, tender_data=m_tender_data)
-            )
+        # поиск по названию и описанию текущей версии, сортировка по релевантности
+        if q:
+            search_clause, rank = text_search(MTenderData, q)
+            query = query.where(search_clause).order_by(rank.desc(), MTender.id)
+        else:
+            query = query.order_by(MTenderData.name, MTender.id)
+
+        return query.offset(offset).limit(limit)
+
+    async def get_tenders_by_kwargs(self, **kwargs):
+        rows = await self.db.execute(await self._tenders_page_query((MTender, MTenderData), **kwargs))
+        return [
+            await self.get_response_schema(tender=m_tender, tender_data=m_tender_data_with_last_version)
+            for m_tender, m_tender_data_with_last_version in rows
+        ]
+
+    async def get_tenders_page_keys(self, **kwargs):
+        """
+        Строки страницы (id, version, status, name) с теми же фильтрами, что у get_tenders_by_kwargs:
+        их достаточно для ETag и курсора, поэтому проверка If-None-Match не загружает описания и не строит схемы
+        """
+        return (await self.db.execute(await self._tenders_page_query(self.PAGE_KEY_COLUMNS, **kwargs))).all()
 
-        tender_schemas.sort(key=lambda x: x.name)
-        return tender_schemas[offset:offset + limit]
+    EXPORT_COLUMNS = ('id', 'name', 'description', 'status', 'serviceType', 'version', 'createdAt')
+
+    async def export_tenders(
+            self, service_type: TenderServiceType | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[dict]]:
+        """
+        Все тендеры с данными текущей версии пачками по batch_size строк.
+        Строки читаются серверным курсором, поэтому память не зависит от размера таблицы.
+        """
+        query = (
+            select(
+                MTender.id,
+                MTenderData.name,
+                MTenderData.description,
+                MTender.status,
+                MTenderData.service_type.label('serviceType'),
+                MTenderData.version,
+                MTender.created_at.label('createdAt'),
+            ).
+            join(MTenderData, MTenderData.id == MTender.current_data_id).
+            execution_options(yield_per=batch_size)
+        )
+        if service_type:
+            query = query.where(MTenderData.service_type == service_type)
+        result = await self.db.stream(query)
+        async for batch in result.mappings().partitions():
+            yield [dict(row) for row in batch]
 
     async def get_tender_status_by_id(self, tender_id: UUID, username: str):
         m_tender = await self._get_obj_by_id(tender_id)
@@ -192,27 +381,76 @@ class TenderDAO(TenderCRUD, OrganizationCRUD, EmployeeCRUD):
         await self.raise_exception_if_forbidden(username=username, m_tender=m_tender)
         return m_tender.status
 
+    async def get_tender_etag(self, tender_id: UUID) -> str:
+        """
+        ETag тендера: меняется при смене статуса (status и updated_at: в SQLite время с точностью до секунды)
+        и при каждой новой версии (current_data_id).
+        Строка берется из кэша запроса, поэтому после проверки прав дополнительных запросов нет
+        """
+        m_tender = await self._get_obj_by_id(tender_id)
+        return make_etag(m_tender.id, m_tender.status, m_tender.updated_at, m_tender.current_data_id)
+
     async def change_tender_status_by_id(self, tender_id: UUID, status: TenderStatus, username: str):
         m_tender = await self._get_obj_by_id(tender_id)
         await self.raise_exception_if_forbidden(username=username, m_tender=m_tender)
         setattr(m_tender, 'status', status)
-        await self.db.commit()
+        await self.db.flush()
         return await self.get_response_schema(tender=m_tender)
 
-    async def rollback_tender(self, tender_id: UUID, version: int, username: str):
+    VERSION_FIELDS = {
+        'name': MTenderData.name,
+        'description': MTenderData.description,
+        'serviceType': MTenderData.service_type,
+    }
+
+    async def get_tender_versions(
+            self,
+            tender_id: UUID,
+            username: str,
+            from_version: int = 1,
+            to_version: int | None = None,
+            limit: int | None = None,
+            fields: str | None = None,
+            diff_from: int | None = None,
+            diff_to: int | None = None,
+    ) -> SVersionHistory:
+        """
+        История версий тендера доступна ответственным за организацию (как редактирование и откат)
+        """
+        await self.raise_exception_if_forbidden(username=username, tender_id=tender_id)
+        return await get_version_history(
+            self.db,
+            version_column=MTenderData.version,
+            owner_clause=MTenderData.tender_id == tender_id,
+            fields=select_version_fields(fields, self.VERSION_FIELDS),
+            from_version=from_version,
+            to_version=to_version,
+            limit=limit,
+            diff_from=diff_from,
+            diff_to=diff_to,
+        )
+
+    async def rollback_tender(
+            self, tender_id: UUID, version: int, username: str, expected_version: ExpectedVersion | None = None
+    ) -> STenderRead:
+        await self._lock_obj_by_id(tender_id)
         await self.raise_exception_if_forbidden(username=username, tender_id=tender_id)
         m_tender_data_with_given_version = await self._get_obj_data_by_version(tender_id, version)
         m_tender_data_with_last_version = await self._get_obj_data_with_last_version_by_id(tender_id)
-        m_new_tender_data = MTenderData(
+        check_expected_version(
+            m_tender_data_with_last_version.version, await self.get_tender_etag(tender_id), expected_version
+        )
+        # описание не копируется: новая версия ссылается на уже сохраненный текст
+        m_new_tender_data = await self._add_obj_to_obj_data_db(
             tender_id=tender_id,
             version=m_tender_data_with_last_version.version + 1,
             name=m_tender_data_with_given_version.name,
             description=m_tender_data_with_given_version.description,
             service_type=m_tender_data_with_given_version.service_type,
+            stored_description=self._stored_text_columns(m_tender_data_with_given_version),
         )
-        self.db.add(m_new_tender_data)
-        await self.db.commit()
-        return m_new_tender_data
+        m_tender = await self._set_current_data(await self._get_obj_by_id(tender_id), m_new_tender_data)
+        return await self.get_response_schema(tender=m_tender, tender_data=m_new_tender_data)
 
     async def raise_exception_if_forbidden(
             self,
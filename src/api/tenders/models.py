@@ -1,8 +1,9 @@
 import uuid
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, func, UUID
+from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, func, UUID, UniqueConstraint, CheckConstraint, Index
 
+from src.api.text_blobs.models import stored_text_property
 from src.database.database import Base
 
 
@@ -20,22 +21,43 @@ class TenderStatus(str, Enum):
 
 class MTender(Base):
     __tablename__ = 'tender'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_tender_current_data_id', 'current_data_id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # id = Column(Integer, primary_key=True)
     status = Column(String, nullable=False)
     organization_id = Column(UUID(as_uuid=True), ForeignKey('organization.id'), nullable=False)
+    # указатель на строку tender_data с текущей (последней) версией
+    current_data_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('tender_data.id', use_alter=True, name='fk_tender_current_data_id'),
+        nullable=True,
+    )
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
 
 class MTenderData(Base):
     __tablename__ = 'tender_data'
+    __table_args__ = (
+        UniqueConstraint('tender_id', 'version', name='uq_tender_data_tender_id_version'),
+        CheckConstraint(
+            'description IS NOT NULL OR description_hash IS NOT NULL', name='ck_tender_data_description_stored'
+        ),
+        Index('ix_tender_data_description_hash', 'description_hash'),
+        # GIN-индексы для поиска (to_tsvector, pg_trgm) есть только в PostgreSQL и создаются миграцией 0006
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # id = Column(Integer, primary_key=True)
     tender_id = Column(UUID(as_uuid=True), ForeignKey('tender.id'), nullable=False)
     version = Column(Integer, nullable=False)
     name = Column(String, nullable=False)
-    description = Column(String, nullable=False)
+    # описание хранится либо в строке (description), либо в text_blob (description_hash), см. TextBlobCRUD
+    description_text = Column('description', String, nullable=True)
+    description_hash = Column(String(64), ForeignKey('text_blob.hash'), nullable=True)
+    description = stored_text_property(description_text, description_hash)
     service_type = Column(String, nullable=False)
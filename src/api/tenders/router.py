@@ -1,17 +1,31 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Body, Depends, Header, Query, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.etag import ETAG_HEADER, conditional_response, items_etag, page_not_modified
+from src.api.schemas import SVersionHistory
+from src.api.pagination import set_next_cursor, NEXT_CURSOR_HEADER
+from src.api.response_cache import CachedResponse
+from src.api.streaming import ndjson_chunks, csv_chunks
+from src.api.versions import parse_expected_version
+
+from src.api.tenders.cache import tender_list_cache
 from src.api.tenders.dao import TenderDAO
 from src.api.tenders.models import TenderServiceType, TenderStatus
-from src.api.tenders.schemas import STenderCreate, STenderUpdate, STenderRead
+from src.database.database import get_db, get_primary_db
+from src.api.tenders.schemas import STenderCreate, STenderUpdate, STenderRead, STenderBulkResult
 
 router = APIRouter(
     prefix="/api",
     tags=["Tenders"],
 )
 
+tender_list_adapter = TypeAdapter(List[STenderRead])
+
 
 @router.post("/tender/new")
 async def create_tender(
@@ -21,72 +35,201 @@ async def create_tender(
     return await dao.create_tender(tender)
 
 
+@router.post("/tenders/bulk")
+async def create_tenders_bulk(
+        tenders: List[STenderCreate] = Body(..., max_length=10000),
+        dao: TenderDAO = Depends()
+) -> List[STenderBulkResult]:
+    """
+    Создание пачки тендеров в одной транзакции. Для каждого элемента возвращается созданный тендер или ошибка.
+    """
+    return await dao.create_tenders_bulk(tenders)
+
+
 @router.get("/tenders/")
 async def get_all_tenders_by_filter(
+        request: Request,
+        response: Response,
         limit: int = Query(5, ge=0),
         offset: int = Query(0, ge=0),
         service_type: Optional[TenderServiceType] = None,
-        dao: TenderDAO = Depends()
+        after: Optional[str] = None,
+        q: Optional[str] = Query(None, min_length=1),
+        db: AsyncSession = Depends(get_primary_db, scope='function'),
 ):
-    return await dao.get_tenders_by_kwargs(
-        limit=limit,
-        offset=offset,
-        service_type=service_type
-    )
+    """
+    Для keyset-пагинации передайте в after значение заголовка X-Next-Cursor предыдущей страницы.
+    q - поиск по названию и описанию с сортировкой по релевантности (только с offset-пагинацией).
+    Ответ одинаков для всех клиентов, поэтому кэшируется целиком и сбрасывается после коммита изменений тендеров.
+    Кэш заполняется только из основной БД: при попадании в кэш запросов в БД нет, а страница с отстающей
+    реплики отдавалась бы всем клиентам (в т.ч. только что изменившему тендер) до истечения TTL.
+    """
+    key = await tender_list_cache.make_key(service_type, limit, offset, after, q)
+    cached = await tender_list_cache.get(key)
+    if cached is None:
+        tenders = await TenderDAO(db=db).get_tenders_by_kwargs(
+            limit=limit,
+            offset=offset,
+            service_type=service_type,
+            after=after,
+            q=q,
+        )
+        if not q:
+            set_next_cursor(response, tenders, limit)
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        cached = CachedResponse(
+            body=tender_list_adapter.dump_json(tenders),
+            etag=items_etag(tenders),
+            headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {},
+        )
+        await tender_list_cache.set(key, cached)
+    return cached.to_response(request)
 
 
 @router.get("/tenders/my")
 async def get_tenders_by_user(
+        request: Request,
+        response: Response,
         username: str,
         limit: int = Query(5, ge=0),
         offset: int = Query(0, ge=0),
+        after: Optional[str] = None,
+        q: Optional[str] = Query(None, min_length=1),
         dao: TenderDAO = Depends()
 ):
     """
     Показать тендеры, которые доступны данному пользователю.
     То есть либо имеют статус Published, либо имеют пользователь является ответственным за организацию, которая связана с данным тендером.
+    Для keyset-пагинации передайте в after значение заголовка X-Next-Cursor предыдущей страницы.
+    q - поиск по названию и описанию с сортировкой по релевантности (только с offset-пагинацией).
     """
-    return await dao.get_tenders_by_kwargs(
-        limit=limit,
-        offset=offset,
-        username=username
+    page = dict(limit=limit, offset=offset, username=username, after=after, q=q)
+    not_modified = await page_not_modified(
+        request, response, lambda: dao.get_tenders_page_keys(**page), limit, with_cursor=not q
     )
+    if not_modified:
+        return not_modified
+    tenders = await dao.get_tenders_by_kwargs(**page)
+    if not q:
+        set_next_cursor(response, tenders, limit)
+    return conditional_response(request, response, items_etag(tenders)) or tenders
+
+
+@router.get("/tenders/export")
+async def export_tenders(
+        format: Literal['ndjson', 'csv'] = 'ndjson',
+        service_type: Optional[TenderServiceType] = None,
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Выгрузка всего каталога тендеров (данные текущей версии) потоком в формате NDJSON или CSV.
+    """
+    # сессия с scope='request' живет, пока ответ не отправлен целиком: строки читаются во время отправки
+    dao = TenderDAO(db=db)
+    batches = dao.export_tenders(service_type=service_type)
+    if format == 'csv':
+        return StreamingResponse(
+            csv_chunks(batches, columns=dao.EXPORT_COLUMNS),
+            media_type='text/csv',
+            headers={'Content-Disposition': 'attachment; filename="tenders.csv"'},
+        )
+    return StreamingResponse(ndjson_chunks(batches), media_type='application/x-ndjson')
 
 
 @router.get("/tenders/{tenderId}/status")
 async def get_tender_status_by_id(
+        request: Request,
+        response: Response,
         tenderId: UUID,
         username: str,
         dao: TenderDAO = Depends()
 ):
-    return await dao.get_tender_status_by_id(tenderId, username)
+    """
+    Поддерживает условный GET: при совпадении If-None-Match с ETag возвращается 304 без тела.
+    """
+    status = await dao.get_tender_status_by_id(tenderId, username)
+    return conditional_response(request, response, await dao.get_tender_etag(tenderId)) or status
 
 
 @router.put("/tenders/{tenderId}/status")
 async def change_tender_status_by_id(
+        response: Response,
         tenderId: UUID,
         status: TenderStatus,
         username: str,
         dao: TenderDAO = Depends()
 ):
-    return await dao.change_tender_status_by_id(tenderId, status, username)
+    """
+    В заголовке ETag возвращается новый ETag тендера (для If-Match и If-None-Match).
+    """
+    tender = await dao.change_tender_status_by_id(tenderId, status, username)
+    response.headers[ETAG_HEADER] = await dao.get_tender_etag(tenderId)
+    return tender
 
 
 @router.patch("/tenders/{tenderId}/edit")
 async def edit_tender(
+        response: Response,
         tenderId: UUID,
         tender_update_data: STenderUpdate,
         username: str,
+        if_match: Optional[str] = Header(None, alias='If-Match'),
         dao: TenderDAO = Depends()
 ):
-    return await dao.update_tender_by_id(tenderId, tender_update_data, username)
+    """
+    В If-Match можно передать ожидаемую текущую версию или ETag тендера: если тендер уже изменили, вернется 412.
+    В заголовке ETag возвращается новый ETag тендера.
+    """
+    tender = await dao.update_tender_by_id(
+        tenderId, tender_update_data, username, expected_version=parse_expected_version(if_match)
+    )
+    response.headers[ETAG_HEADER] = await dao.get_tender_etag(tenderId)
+    return tender
+
+
+@router.get("/tenders/{tenderId}/versions")
+async def get_tender_versions(
+        tenderId: UUID,
+        username: str,
+        fromVersion: int = Query(1, ge=1),
+        toVersion: Optional[int] = Query(None, ge=1),
+        limit: int = Query(100, ge=1, le=1000),
+        fields: Optional[str] = None,
+        diffFrom: Optional[int] = Query(None, ge=1),
+        diffTo: Optional[int] = Query(None, ge=1),
+        dao: TenderDAO = Depends()
+) -> SVersionHistory:
+    """
+    Версии с fromVersion по toVersion (не больше limit) одним запросом.
+    fields - поля версий через запятую; diffFrom и diffTo - посчитать на сервере diff между двумя версиями.
+    """
+    return await dao.get_tender_versions(
+        tenderId,
+        username,
+        from_version=fromVersion,
+        to_version=toVersion,
+        limit=limit,
+        fields=fields,
+        diff_from=diffFrom,
+        diff_to=diffTo,
+    )
 
 
 @router.put("/tenders/{tenderId}/rollback/{version}")
 async def rollback_tender(
+        response: Response,
         tenderId: UUID,
         username: str,
         version: int = Path(..., ge=0),
+        if_match: Optional[str] = Header(None, alias='If-Match'),
         dao: TenderDAO = Depends()
-):
-    return await dao.rollback_tender(tenderId, version, username)
+) -> STenderRead:
+    """
+    В If-Match можно передать ожидаемую текущую версию или ETag тендера: если тендер уже изменили, вернется 412.
+    В заголовке ETag возвращается новый ETag тендера.
+    """
+    tender = await dao.rollback_tender(
+        tenderId, version, username, expected_version=parse_expected_version(if_match)
+    )
+    response.headers[ETAG_HEADER] = await dao.get_tender_etag(tenderId)
+    return tender
@@ -3,6 +3,7 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
+from src.api.schemas import SBulkError
 from src.api.tenders.models import TenderServiceType, TenderStatus
 
 
@@ -28,3 +29,9 @@ class STenderUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
     serviceType: TenderServiceType | None = None
+
+
+class STenderBulkResult(BaseModel):
+    index: int
+    tender: STenderRead | None = None
+    error: SBulkError | None = None
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Iterable, List
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.api.dao import DAO
+from src.api.text_blobs.models import MTextBlob
+from src.settings import settings
+
+
+class VersionStorageMode:
+    full = 'full'
+    dedup = 'dedup'
+
+
+# INSERT ... ON CONFLICT DO NOTHING есть только в диалектных insert: PostgreSQL в работе, SQLite в бенчмарке и тестах
+_UPSERT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class TextBlobCRUD(DAO):
+    """
+    Хранение описаний версий (tender_data, bid_data).
+    В режиме VERSION_STORAGE_MODE=full описание целиком пишется в строку версии.
+    В режиме dedup описания длиннее TEXT_BLOB_MIN_LENGTH пишутся один раз в text_blob, а версия хранит только хэш,
+    поэтому новые версии с тем же описанием (правка названия, откат) не копируют текст.
+    """
+
+    @staticmethod
+    def _stored_text_columns(m_obj_data) -> dict:
+        """
+        Колонки уже сохраненного описания версии, чтобы новая версия ссылалась на тот же текст без повторной записи
+        """
+        return {'description_text': m_obj_data.description_text, 'description_hash': m_obj_data.description_hash}
+
+    @staticmethod
+    def _should_dedup(text: str) -> bool:
+        return settings.version_storage_mode == VersionStorageMode.dedup and len(text) >= settings.text_blob_min_length
+
+    async def _store_text(self, text: str) -> dict:
+        return (await self._store_texts([text]))[0]
+
+    async def _store_texts(self, texts: Iterable[str]) -> List[dict]:
+        """
+        Колонки (description_text, description_hash) для каждого текста.
+        Новые тексты для text_blob записываются одним INSERT ... ON CONFLICT DO NOTHING
+        """
+        columns = []
+        blobs = {}
+        for text in texts:
+            if self._should_dedup(text):
+                blob_hash = text_hash(text)
+                blobs[blob_hash] = text
+                columns.append({'description_text': None, 'description_hash': blob_hash})
+            else:
+                columns.append({'description_text': text, 'description_hash': None})
+        if blobs:
+            insert = _UPSERT_INSERTS[self.db.get_bind().dialect.name]
+            await self.db.execute(
+                insert(MTextBlob).
+                values([{'hash': blob_hash, 'content': content} for blob_hash, content in blobs.items()]).
+                on_conflict_do_nothing(index_elements=['hash'])
+            )
+        return columns
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Text, select, func
+from sqlalchemy.orm import column_property
+
+from src.database.database import Base
+
+
+class MTextBlob(Base):
+    """
+    Дедуплицированные тексты описаний версий: одна строка на уникальное содержимое (адресация по sha256)
+    """
+    __tablename__ = 'text_blob'
+
+    hash = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+
+
+def stored_text_property(text_column: Column, hash_column: Column):
+    """
+    Текст версии: хранится либо в самой строке (text_column), либо в text_blob по хэшу (hash_column).
+    Не сбрасывается после flush: для новых строк значение проставляет DAO, чтобы не перечитывать его из БД
+    """
+    return column_property(
+        func.coalesce(
+            text_column,
+            select(MTextBlob.content).where(MTextBlob.hash == hash_column).scalar_subquery(),
+        ),
+        expire_on_flush=False,
+    )
@@ -0,0 +1,122 @@
+import difflib
+from dataclasses import dataclass
+from typing import Mapping
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas import SVersionDiff, SVersionHistory
+
+
+@dataclass(frozen=True)
+class ExpectedVersion:
+    """
+    Условие из заголовка If-Match: номера версий и/или ETag сущности (тот же, что отдают GET .../status,
+    правка, откат и смена статуса)
+    """
+    versions: frozenset[int] = frozenset()
+    etags: frozenset[str] = frozenset()
+
+    def matches(self, current_version: int, current_etag: str) -> bool:
+        return current_version in self.versions or current_etag in self.etags
+
+
+def parse_expected_version(if_match: str | None) -> ExpectedVersion | None:
+    """
+    If-Match: список через запятую из номеров версий (3 или "3") и ETag сущности, * - любая версия
+    """
+    if if_match is None or if_match.strip() == '*':
+        return None
+    versions, etags = set(), set()
+    for tag in if_match.split(','):
+        tag = tag.strip().removeprefix('W/')
+        if tag.strip('"').isdigit():
+            versions.add(int(tag.strip('"')))
+        elif len(tag) > 2 and tag.startswith('"') and tag.endswith('"'):
+            etags.add(tag)
+        else:
+            raise HTTPException(
+                status_code=400, detail=f"If-Match must contain version numbers or ETags, got {if_match!r}."
+            )
+    return ExpectedVersion(versions=frozenset(versions), etags=frozenset(etags))
+
+
+def check_expected_version(current_version: int, current_etag: str, expected: ExpectedVersion | None) -> None:
+    if expected is not None and not expected.matches(current_version, current_etag):
+        raise HTTPException(
+            status_code=412,
+            detail=f"If-Match does not match the current version {current_version} (ETag {current_etag}).",
+        )
+
+
+def select_version_fields(fields: str | None, available: Mapping[str, object]) -> dict[str, object]:
+    """
+    Проекция полей версии: fields - имена через запятую (по умолчанию все поля)
+    """
+    if not fields:
+        return dict(available)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}. Available fields: {list(available)}.",
+        )
+    return {name: available[name] for name in names}
+
+
+def diff_versions(old: dict, new: dict, fields) -> SVersionDiff:
+    changes = {}
+    for field in fields:
+        old_value, new_value = str(old[field]), str(new[field])
+        if old_value != new_value:
+            changes[field] = '\n'.join(difflib.unified_diff(
+                old_value.splitlines(),
+                new_value.splitlines(),
+                fromfile=f'{field}@{old["version"]}',
+                tofile=f'{field}@{new["version"]}',
+                lineterm='',
+            ))
+    return SVersionDiff(fromVersion=old['version'], toVersion=new['version'], changes=changes)
+
+
+async def get_version_history(
+        db: AsyncSession,
+        version_column,
+        owner_clause,
+        fields: dict[str, object],
+        from_version: int = 1,
+        to_version: int | None = None,
+        limit: int | None = None,
+        diff_from: int | None = None,
+        diff_to: int | None = None,
+) -> SVersionHistory:
+    """
+    Диапазон версий одним запросом по индексу (owner_id, version) и, если переданы diff_from и diff_to,
+    diff между этими версиями по выбранным полям. owner_clause - условие на владельца версий (tender_id/bid_id)
+    """
+    columns = [version_column.label('version'), *(column.label(name) for name, column in fields.items())]
+    query = select(*columns).where(owner_clause).where(version_column >= from_version)
+    if to_version is not None:
+        query = query.where(version_column <= to_version)
+    query = query.order_by(version_column).limit(limit)
+    versions = [dict(row) for row in (await db.execute(query)).mappings()]
+    history = SVersionHistory(versions=versions)
+
+    if diff_from is None and diff_to is None:
+        return history
+    if diff_from is None or diff_to is None:
+        raise HTTPException(status_code=400, detail="Both diffFrom and diffTo must be provided.")
+
+    by_version = {row['version']: row for row in versions}
+    missing = {diff_from, diff_to} - by_version.keys()
+    if missing:
+        # версии для diff вне запрошенного диапазона дочитываются одним запросом
+        query = select(*columns).where(owner_clause).where(version_column.in_(missing))
+        by_version.update({row['version']: dict(row) for row in (await db.execute(query)).mappings()})
+        not_found = missing - by_version.keys()
+        if not_found:
+            raise HTTPException(status_code=404, detail=f"Versions {sorted(not_found)} not found.")
+    history.diff = diff_versions(by_version[diff_from], by_version[diff_to], fields)
+    return history
@@ -0,0 +1,169 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from sqlalchemy import insert, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.bids.models import MBid, MBidData, MBidFeedback, MBidDecision, BidStatus, BidAuthorType, BidDecision
+from src.api.employees.models import MEmployee
+from src.api.organisations.models import MOrganization, MOrganizationResponsible
+from src.api.tenders.models import MTender, MTenderData, TenderStatus, TenderServiceType
+
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    organizations: int
+    employees: int
+    responsibles_per_organization: int
+    tenders_per_organization: int
+    tender_versions: int
+    bids_per_tender: int
+    bid_versions: int
+    feedbacks_per_bid: int
+    decisions_per_bid: int
+
+
+SIZES = {
+    'small': DatasetSize(
+        organizations=10, employees=100, responsibles_per_organization=3, tenders_per_organization=20,
+        tender_versions=3, bids_per_tender=2, bid_versions=2, feedbacks_per_bid=1, decisions_per_bid=1,
+    ),
+    'medium': DatasetSize(
+        organizations=50, employees=1000, responsibles_per_organization=3, tenders_per_organization=100,
+        tender_versions=5, bids_per_tender=3, bid_versions=3, feedbacks_per_bid=1, decisions_per_bid=1,
+    ),
+    'large': DatasetSize(
+        organizations=200, employees=10000, responsibles_per_organization=4, tenders_per_organization=1000,
+        tender_versions=5, bids_per_tender=3, bid_versions=3, feedbacks_per_bid=2, decisions_per_bid=2,
+    ),
+}
+
+
+@dataclass
+class Dataset:
+    """
+    Идентификаторы сгенерированных сущностей, по которым строятся запросы бенчмарка
+    """
+    usernames: dict[UUID, str] = field(default_factory=dict)
+    responsibles: dict[UUID, list[UUID]] = field(default_factory=dict)
+    tenders: list[tuple[UUID, UUID]] = field(default_factory=list)  # (tender_id, organization_id)
+    user_bids: list[tuple[UUID, UUID, UUID]] = field(default_factory=list)  # (bid_id, tender_id, author_id)
+    organization_bids: list[tuple[UUID, UUID, UUID]] = field(default_factory=list)
+
+    def responsible_username(self, organization_id: UUID, i: int = 0) -> str:
+        user_ids = self.responsibles[organization_id]
+        return self.usernames[user_ids[i % len(user_ids)]]
+
+
+async def _bulk_insert(session: AsyncSession, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+async def _bulk_set_current_data(session: AsyncSession, model, pointers: list[dict]) -> None:
+    query = (
+        update(model.__table__).
+        where(model.__table__.c.id == bindparam('b_id')).
+        values(current_data_id=bindparam('b_current_data_id'))
+    )
+    for start in range(0, len(pointers), BATCH_SIZE):
+        await session.execute(query, pointers[start:start + BATCH_SIZE])
+
+
+async def seed(session: AsyncSession, size: DatasetSize, random_seed: int = 0) -> Dataset:
+    """
+    Заполнение пустой БД синтетическими данными (детерминированно для заданного random_seed)
+    """
+    rnd = random.Random(random_seed)
+    make_uuid = lambda: uuid.UUID(int=rnd.getrandbits(128), version=4)
+    dataset = Dataset()
+
+    employees = [{'id': make_uuid(), 'username': f'user{i}'} for i in range(size.employees)]
+    dataset.usernames = {row['id']: row['username'] for row in employees}
+    organizations = [{'id': make_uuid(), 'name': f'organization{i}'} for i in range(size.organizations)]
+    responsibles = []
+    for organization in organizations:
+        user_ids = rnd.sample(list(dataset.usernames), size.responsibles_per_organization)
+        dataset.responsibles[organization['id']] = user_ids
+        responsibles += [
+            {'id': make_uuid(), 'organization_id': organization['id'], 'user_id': user_id} for user_id in user_ids
+        ]
+
+    tenders, tender_data, tender_pointers = [], [], []
+    for organization in organizations:
+        for _ in range(size.tenders_per_organization):
+            tender_id = make_uuid()
+            dataset.tenders.append((tender_id, organization['id']))
+            tenders.append({
+                'id': tender_id,
+                'organization_id': organization['id'],
+                'status': rnd.choice([TenderStatus.created, TenderStatus.published, TenderStatus.published]),
+            })
+            service_type = rnd.choice(list(TenderServiceType))
+            for version in range(1, size.tender_versions + 1):
+                data_id = make_uuid()
+                tender_data.append({
+                    'id': data_id,
+                    'tender_id': tender_id,
+                    'version': version,
+                    'name': f'tender {rnd.getrandbits(32):08x}',
+                    'description_text': f'tender description v{version} ' + 'x' * rnd.randint(20, 200),
+                    'service_type': service_type,
+                })
+            tender_pointers.append({'b_id': tender_id, 'b_current_data_id': data_id})
+
+    bids, bid_data, bid_pointers, feedbacks, decisions = [], [], [], [], []
+    for tender_id, organization_id in dataset.tenders:
+        for _ in range(size.bids_per_tender):
+            bid_id = make_uuid()
+            if rnd.random() < 0.5:
+                author_type, author_id = BidAuthorType.user, rnd.choice(employees)['id']
+                dataset.user_bids.append((bid_id, tender_id, author_id))
+            else:
+                author_type, author_id = BidAuthorType.organization, rnd.choice(organizations)['id']
+                dataset.organization_bids.append((bid_id, tender_id, author_id))
+            voters = dataset.responsibles[organization_id][:size.decisions_per_bid]
+            bids.append({
+                'id': bid_id,
+                'tender_id': tender_id,
+                'author_type': author_type,
+                'author_id': author_id,
+                'status': rnd.choice([BidStatus.created, BidStatus.published]),
+                'approved_count': len(voters),
+            })
+            for version in range(1, size.bid_versions + 1):
+                data_id = make_uuid()
+                bid_data.append({
+                    'id': data_id,
+                    'bid_id': bid_id,
+                    'version': version,
+                    'name': f'bid {rnd.getrandbits(32):08x}',
+                    'description_text': f'bid description v{version}',
+                })
+            bid_pointers.append({'b_id': bid_id, 'b_current_data_id': data_id})
+            feedbacks += [
+                {'id': make_uuid(), 'bid_id': bid_id, 'feedback': f'feedback {i}'}
+                for i in range(size.feedbacks_per_bid)
+            ]
+            decisions += [
+                {'id': make_uuid(), 'bid_id': bid_id, 'employee_id': user_id, 'decision': BidDecision.approved}
+                for user_id in voters
+            ]
+
+    await _bulk_insert(session, MEmployee, employees)
+    await _bulk_insert(session, MOrganization, organizations)
+    await _bulk_insert(session, MOrganizationResponsible, responsibles)
+    await _bulk_insert(session, MTender, tenders)
+    await _bulk_insert(session, MTenderData, tender_data)
+    await _bulk_set_current_data(session, MTender, tender_pointers)
+    await _bulk_insert(session, MBid, bids)
+    await _bulk_insert(session, MBidData, bid_data)
+    await _bulk_set_current_data(session, MBid, bid_pointers)
+    await _bulk_insert(session, MBidFeedback, feedbacks)
+    await _bulk_insert(session, MBidDecision, decisions)
+    await session.commit()
+    return dataset
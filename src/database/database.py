@@ -1,12 +1,20 @@
-from typing import Generator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable
 
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
+from src.database.routing import ReplicaRouter, READ_METHODS, request_usernames, session_usernames
 from src.settings import settings
 
-async_engine = create_async_engine(settings.db.url(), future=True, echo=False)
+async_engine = create_async_engine(settings.db.url(), future=True, echo=False, **settings.db.engine_kwargs())
+replica_engines = [
+    create_async_engine(url, future=True, echo=False, **settings.db.engine_kwargs())
+    for url in settings.db.replica_urls()
+]
+replica_router = ReplicaRouter(replica_engines, settings.db.read_your_writes_window)
 AsyncSessionLocal = sessionmaker(
     async_engine, expire_on_commit=False, autocommit=False, autoflush=False, class_=AsyncSession
 )
@@ -14,9 +22,52 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
-async def get_db() -> Generator:
-    try:
-        session: AsyncSession = AsyncSessionLocal()
+_AFTER_COMMIT_KEY = 'after_commit_callbacks'
+
+
+def call_after_commit(session: Session, callback: Callable[[], Awaitable]) -> None:
+    """
+    Асинхронное действие после коммита транзакции запроса (например сброс кэша во внешнем хранилище).
+    Синхронные события сессии (after_commit) не могут его дождаться, поэтому его выполняет get_db
+    после коммита и до отправки ответа
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def run_after_commit_callbacks(session: AsyncSession) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        await callback()
+
+
+@asynccontextmanager
+async def request_session(request: Request, replica: AsyncEngine | None) -> AsyncIterator[AsyncSession]:
+    """
+    Сессия на запрос: весь запрос выполняется в одной транзакции, которая коммитится после успешного
+    выполнения обработчика и откатывается при исключении (в т.ч. HTTPException).
+    replica - движок реплики для чтения или None для основной БД
+    """
+    session_kwargs = {'bind': replica} if replica is not None else {}
+    async with AsyncSessionLocal(**session_kwargs) as session:
+        async with session.begin():
+            yield session
+        await run_after_commit_callbacks(session)
+    if replica is None and request.method not in READ_METHODS:
+        await replica_router.pin(request_usernames(request) | session_usernames(session))
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    DAO получают сессию с scope='function', чтобы коммит произошел до отправки ответа клиенту.
+    Если настроены реплики, GET-запросы читают с реплики (см. ReplicaRouter), остальные идут в основную БД.
+    """
+    async with request_session(request, await replica_router.engine_for(request)) as session:
+        yield session
+
+
+async def get_primary_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия основной БД и для GET-запросов: для чтений, результат которых кэшируется для всех клиентов,
+    иначе отстающая реплика заполнила бы кэш устаревшими данными на все время жизни записи
+    """
+    async with request_session(request, None) as session:
         yield session
-    finally:
-        await session.close()
@@ -1,35 +1,16 @@
-from sqlalchemy import create_engine
+from pathlib import Path
 
-from src.database.database import Base
-from src.settings import settings
+from alembic import command
+from alembic.config import Config
 
-from src.api.tenders.models import MTender, MTenderData
-from src.api.bids.models import MBid, MBidData
-from src.api.organisations.models import MOrganization, MOrganizationResponsible
-from src.api.employees.models import MEmployee
+ALEMBIC_CONFIG_PATH = Path(__file__).resolve().parents[2] / 'alembic.ini'
 
 
-def init_db(
-        create_organisations: bool = False,
-        create_employee: bool = False,
-):
-    # tables = [
-    #     MTender.__tablename__,
-    #     MTenderData.__tablename__,
-    #     MBid.__tablename__,
-    #     MBidData.__tablename__
-    # ]
-    # if create_organisations:
-    #     tables.append(MOrganization.__tablename__)
-    #     tables.append(MOrganizationResponsible.__tablename__)
-    # if create_employee:
-    #     tables.append(MEmployee.__tablename__)
-
-    sync_engine = create_engine(settings.db.url(is_async=False), echo=True)
-    Base.metadata.create_all(
-        bind=sync_engine,
-        # tables=tables
-    )
+def init_db():
+    """
+    Приведение схемы БД к актуальной версии (alembic upgrade head)
+    """
+    command.upgrade(Config(str(ALEMBIC_CONFIG_PATH)), 'head')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import cycle
+from typing import Iterable, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+_SESSION_USERNAMES_KEY = 'request_usernames'
+
+
+def request_usernames(request: Request) -> set[str]:
+    """
+    Пользователи, от имени которых выполняется чтение (query-параметры username / requesterUsername)
+    """
+    params = request.query_params
+    return {username for username in (params.get('username'), params.get('requesterUsername')) if username}
+
+
+def remember_usernames(session: AsyncSession, usernames: Iterable[str]) -> None:
+    """
+    Запоминает в сессии пользователей, с которыми работал запрос (в т.ч. из тела POST-запроса):
+    после записи за основной БД закрепляются именно они
+    """
+    session.info.setdefault(_SESSION_USERNAMES_KEY, set()).update(usernames)
+
+
+def session_usernames(session: AsyncSession) -> set[str]:
+    return session.info.get(_SESSION_USERNAMES_KEY, set())
+
+
+class ReadYourWritesBackend(ABC):
+    """
+    Хранилище закреплений пользователей за основной БД. Методы асинхронные, чтобы за интерфейсом можно было
+    поставить внешнее хранилище, общее для всех процессов сервиса (например в Redis: SET username 1 EX ttl
+    при записи и EXISTS при чтении)
+    """
+
+    @abstractmethod
+    async def pin(self, usernames: Iterable[str], ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def is_pinned(self, usernames: Iterable[str]) -> bool:
+        ...
+
+
+class InMemoryReadYourWritesBackend(ReadYourWritesBackend):
+    """
+    Процессное хранилище (по умолчанию): закрепление видно только процессу, который выполнил запись
+    """
+
+    def __init__(self):
+        # время окончания закрепления одинаково отстоит от момента записи (ttl одинаковый),
+        # поэтому порядок вставки совпадает с порядком истечения
+        self._pinned: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pinned)
+
+    def _expire(self, now: float) -> None:
+        while self._pinned:
+            username, expires_at = next(iter(self._pinned.items()))
+            if expires_at > now:
+                break
+            self._pinned.popitem(last=False)
+
+    async def pin(self, usernames: Iterable[str], ttl: float) -> None:
+        expires_at = time.monotonic() + ttl
+        for username in usernames:
+            self._pinned[username] = expires_at
+            self._pinned.move_to_end(username)
+
+    async def is_pinned(self, usernames: Iterable[str]) -> bool:
+        self._expire(time.monotonic())
+        return any(username in self._pinned for username in usernames)
+
+
+class ReplicaRouter:
+    """
+    Выбор движка БД для запроса: чтение (GET) идет на реплики по кругу, запись - на основную БД.
+    После записи пользователи запроса на read_your_writes_window секунд закрепляются за основной БД,
+    чтобы они сразу видели свои изменения, даже если реплика еще не догнала основную БД.
+    Закрепление идет по username, а не по адресу клиента: за прокси или балансировщиком у всех клиентов
+    один адрес, и одна запись отправляла бы на основную БД все чтения.
+
+    Ограничения:
+    - закрепления хранятся в backend; хранилище по умолчанию (InMemoryReadYourWritesBackend) процессное,
+      поэтому при нескольких процессах или инстансах сервиса чтение, попавшее в другой процесс, идет
+      на реплику. Для гарантии нужно общее хранилище (реализация ReadYourWritesBackend поверх Redis и т.п.);
+    - чтение закрепляется, только если пользователь передан в query-параметре username или
+      requesterUsername (см. request_usernames); запросы без них (например /api/tenders/export и get_all)
+      всегда читают с реплики.
+    """
+
+    def __init__(
+            self,
+            replicas: list[AsyncEngine],
+            read_your_writes_window: float,
+            backend: ReadYourWritesBackend | None = None,
+    ):
+        self.replicas = replicas
+        self.read_your_writes_window = read_your_writes_window
+        self.backend = backend if backend is not None else InMemoryReadYourWritesBackend()
+        self._replicas_cycle = cycle(replicas) if replicas else None
+
+    async def is_pinned(self, request: Request) -> bool:
+        usernames = request_usernames(request)
+        return bool(usernames) and await self.backend.is_pinned(usernames)
+
+    async def pin(self, usernames: Iterable[str]) -> None:
+        usernames = set(usernames)
+        if not self.replicas or self.read_your_writes_window <= 0 or not usernames:
+            return
+        await self.backend.pin(usernames, self.read_your_writes_window)
+
+    async def engine_for(self, request: Request) -> Optional[AsyncEngine]:
+        """
+        Реплика для чтения или None, если запрос нужно выполнить на основной БД
+        """
+        if self._replicas_cycle is None or request.method not in READ_METHODS:
+            return None
+        if await self.is_pinned(request):
+            return None
+        return next(self._replicas_cycle)
@@ -0,0 +1,30 @@
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import Connection, text
+
+SEARCH_INDEXES_MIGRATION = Path(__file__).resolve().parents[2] / 'migrations' / 'versions' / '0006_search_indexes.py'
+
+
+def search_extension_available(connection: Connection) -> bool:
+    """
+    Можно ли поставить pg_trgm (только PostgreSQL)
+    """
+    if connection.dialect.name != 'postgresql':
+        return False
+    available = connection.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    return available.first() is not None
+
+
+def create_search_indexes(connection: Connection) -> None:
+    """
+    Расширение pg_trgm и индексы поиска для схемы, созданной по моделям (тесты, бенчмарк), а не миграциями.
+    Выполняется upgrade() самой миграции 0006, чтобы индексы совпадали с индексами рабочей БД
+    """
+    spec = importlib.util.spec_from_file_location('search_indexes_migration', SEARCH_INDEXES_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
@@ -0,0 +1,187 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class RequestDBStats:
+    """
+    Статистика обращений к БД в рамках одного HTTP-запроса
+    """
+    statements: int = 0
+    db_time: float = 0.0
+
+
+# объект изменяемый: контекст копируется в дочерние задачи, а счетчики должны остаться общими
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar('request_db_stats', default=None)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency',
+    ['method', 'route', 'status'],
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    'db_statements_per_request',
+    'SQL statements executed while handling one HTTP request',
+    ['method', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    'db_time_per_request_seconds',
+    'Total time spent in SQL statements while handling one HTTP request',
+    ['method', 'route'],
+)
+DB_STATEMENTS = Counter('db_statements', 'SQL statements executed', ['engine'])
+DB_STATEMENT_DURATION = Histogram('db_statement_duration_seconds', 'SQL statement latency', ['engine'])
+
+
+class _EnginePoolCollector:
+    """
+    Состояние пулов соединений инструментированных движков
+    """
+
+    def __init__(self):
+        self.engines: dict[str, AsyncEngine] = {}
+
+    def collect(self):
+        size = GaugeMetricFamily('db_pool_size', 'Configured pool size', labels=['engine'])
+        checked_out = GaugeMetricFamily('db_pool_checked_out', 'Connections checked out of the pool', labels=['engine'])
+        overflow = GaugeMetricFamily('db_pool_overflow', 'Connections opened above pool size', labels=['engine'])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            if hasattr(pool, 'checkedout'):
+                size.add_metric([name], pool.size())
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+
+class _CacheCollector:
+    """
+    Счетчики попаданий/промахов кэшей (объекты с атрибутами hits и misses)
+    """
+
+    def __init__(self):
+        self.caches: dict[str, object] = {}
+
+    def collect(self):
+        hits = CounterMetricFamily('cache_hits', 'Cache hits', labels=['cache'])
+        misses = CounterMetricFamily('cache_misses', 'Cache misses', labels=['cache'])
+        hit_ratio = GaugeMetricFamily('cache_hit_ratio', 'Cache hits / (hits + misses)', labels=['cache'])
+        for name, cache in self.caches.items():
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            total = cache.hits + cache.misses
+            hit_ratio.add_metric([name], cache.hits / total if total else 0.0)
+        yield hits
+        yield misses
+        yield hit_ratio
+
+
+_pool_collector = _EnginePoolCollector()
+_cache_collector = _CacheCollector()
+REGISTRY.register(_pool_collector)
+REGISTRY.register(_cache_collector)
+
+
+def instrument_engine(engine: AsyncEngine, name: str = 'primary') -> None:
+    """
+    Подсчет SQL-запросов и времени в БД (в целом и для текущего HTTP-запроса) и метрики пула соединений
+    """
+    _pool_collector.engines[name] = engine
+    statements = DB_STATEMENTS.labels(engine=name)
+    statement_duration = DB_STATEMENT_DURATION.labels(engine=name)
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+        statements.inc()
+        statement_duration.observe(elapsed)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+
+
+def register_cache(name: str, cache) -> None:
+    _cache_collector.caches[name] = cache
+
+
+def get_route_path(request: Request) -> str:
+    """
+    Шаблон пути (например /api/tenders/{tenderId}/status), чтобы не плодить метки на каждый id
+    """
+    route = request.scope.get('route')
+    return route.path if route is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware, а не @app.middleware('http'): метрики запроса записываются после отправки последней части
+    тела ответа. У StreamingResponse (выгрузки, get_all) SQL-запросы выполняются во время отправки тела,
+    и при записи в момент возврата ответа из обработчика они не попадали бы в метрики запроса
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+        started_at = time.perf_counter()
+        status = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            if observed:
+                return
+            observed = True
+            request = Request(scope)
+            route = get_route_path(request)
+            HTTP_REQUEST_DURATION.labels(request.method, route, status).observe(time.perf_counter() - started_at)
+            DB_STATEMENTS_PER_REQUEST.labels(request.method, route).observe(stats.statements)
+            DB_TIME_PER_REQUEST.labels(request.method, route).observe(stats.db_time)
+
+        async def send_and_observe(message: Message) -> None:
+            nonlocal status
+            await send(message)
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_and_observe)
+        finally:
+            request_db_stats.reset(token)
+            # исключение в обработчике или ответ без тела
+            observe()
+
+
+def setup_metrics(app: FastAPI) -> None:
+    """
+    Middleware со сбором метрик по запросам и endpoint /metrics в формате Prometheus
+    """
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get('/metrics', include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,233 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, deque
+from types import FrameType
+
+from fastapi import FastAPI, Request
+from prometheus_client import Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.monitoring.metrics import request_db_stats, get_route_path
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Delay of the event loop heartbeat beyond its schedule',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+class LoopLagMonitor:
+    """
+    Детектор блокировок event loop: корутина-пульс отмечается каждые interval секунд, а отдельный поток проверяет,
+    что очередной пульс опаздывает не больше чем на threshold. Иначе в лог пишется стек потока event loop
+    в момент блокировки, то есть код, который ее вызвал (один раз на блокировку)
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_beat = 0.0
+        self._reported_beat: float | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def ensure_started(self) -> None:
+        """
+        Вызывается из потока event loop. При смене event loop (например, в тестах) пульс переносится в новый
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        loop.create_task(self._heartbeat(loop))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._loop = None
+
+    async def _heartbeat(self, loop: asyncio.AbstractEventLoop) -> None:
+        while loop is self._loop:
+            scheduled_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._last_beat = time.monotonic()
+            EVENT_LOOP_LAG.observe(max(0.0, self._last_beat - scheduled_at))
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat - self.interval
+            if lag <= self.threshold or self._reported_beat == last_beat:
+                continue
+            self._reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<no frame>\n'
+            logger.warning('Event loop is blocked for %.3f s, event loop thread stack:\n%s', lag, stack)
+
+
+def _collapse_stack(frame: FrameType) -> str:
+    """
+    Стек в формате folded (от корня к листу через ;), который понимают flamegraph.pl и speedscope
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+class StackSampler:
+    """
+    Статистический профайлер: поток раз в interval секунд снимает стек потока event loop в кольцевой буфер.
+    Профиль запроса - выборки за время его выполнения. В них попадает вся работа event loop за это время,
+    включая конкурентные запросы: именно она и задерживает медленный запрос
+    """
+
+    def __init__(self, interval: float, window: float):
+        self.interval = interval
+        self._samples: deque[tuple[float, str]] = deque(maxlen=max(1, int(window / interval)))
+        self._loop_thread_id: int | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def ensure_started(self) -> None:
+        """
+        Вызывается из потока event loop: выборки снимаются с потока, в котором сейчас работает event loop
+        """
+        self._loop_thread_id = threading.get_ident()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._samples.append((time.monotonic(), _collapse_stack(frame)))
+
+    def stacks_between(self, started_at: float, finished_at: float) -> Counter:
+        return Counter(stack for sampled_at, stack in list(self._samples) if started_at <= sampled_at <= finished_at)
+
+
+def save_profile(directory: str, profile: dict, max_files: int) -> str:
+    """
+    Профиль пишется в отдельный JSON-файл, самые старые файлы сверх max_files удаляются
+    """
+    os.makedirs(directory, exist_ok=True)
+    route = re.sub(r'[^A-Za-z0-9]+', '_', profile['route']).strip('_') or 'root'
+    name = (
+        f"{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:6]}_"
+        f"{profile['method']}_{route}_{int(profile['duration'] * 1000)}ms.json"
+    )
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        json.dump(profile, file, ensure_ascii=False, indent=1)
+    profiles = sorted(file_name for file_name in os.listdir(directory) if file_name.endswith('.json'))
+    for file_name in profiles[:-max_files]:
+        # файл мог уже удалить другой процесс или поток, сохранявший профиль одновременно
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(directory, file_name))
+    return path
+
+
+def _log_save_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error('Failed to save request profile', exc_info=future.exception())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware, а не @app.middleware('http'): запрос считается выполненным после отправки последней
+    части тела ответа. Иначе у StreamingResponse (выгрузки) длительность, выборки стека и SQL-запросы
+    обрезались бы моментом, когда обработчик вернул ответ, а тело еще не начали читать из БД
+    """
+
+    def __init__(self, app: ASGIApp, lag_monitor: LoopLagMonitor | None, sampler: StackSampler | None):
+        self.app = app
+        self.lag_monitor = lag_monitor
+        self.sampler = sampler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        # потоки запускаются при первом запросе: нужен идентификатор потока event loop
+        for tool in (self.lag_monitor, self.sampler):
+            if tool is not None:
+                tool.ensure_started()
+        if self.sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.monotonic()
+        status = None
+
+        async def send_and_profile(message: Message) -> None:
+            nonlocal status
+            await send(message)
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                self._finish(Request(scope), status, started_at)
+
+        await self.app(scope, receive, send_and_profile)
+
+    def _finish(self, request: Request, status: int | None, started_at: float) -> None:
+        finished_at = time.monotonic()
+        if finished_at - started_at < settings.slow_request_threshold:
+            return
+        stats = request_db_stats.get()
+        profile = {
+            'method': request.method,
+            'route': get_route_path(request),
+            'path': request.url.path,
+            'status': status,
+            'duration': finished_at - started_at,
+            'sql_statements': stats.statements if stats is not None else None,
+            'db_time': stats.db_time if stats is not None else None,
+            'sample_interval': self.sampler.interval,
+            'stacks': dict(self.sampler.stacks_between(started_at, finished_at).most_common()),
+        }
+        # запись на диск в пуле потоков, чтобы не блокировать event loop и не задерживать ответ
+        future = asyncio.get_running_loop().run_in_executor(
+            None, save_profile, settings.profile_dir, profile, settings.profile_max_files
+        )
+        future.add_done_callback(_log_save_error)
+
+
+def setup_profiling(app: FastAPI) -> None:
+    """
+    Необязательная диагностика, включается настройками: детектор блокировок event loop (LOOP_LAG_THRESHOLD)
+    и профили медленных запросов (SLOW_REQUEST_THRESHOLD) с маршрутом, числом SQL-запросов и временем в БД.
+    Вызывать до setup_metrics: внутренняя middleware видит счетчики SQL, которые заводит middleware метрик
+    """
+    lag_monitor = LoopLagMonitor(settings.loop_lag_threshold) if settings.loop_lag_threshold > 0 else None
+    sampler = None
+    if settings.slow_request_threshold > 0:
+        sampler = StackSampler(interval=settings.profile_sample_interval, window=settings.profile_window)
+    if lag_monitor is None and sampler is None:
+        return
+
+    app.add_middleware(ProfilingMiddleware, lag_monitor=lag_monitor, sampler=sampler)
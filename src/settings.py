@@ -1,4 +1,5 @@
 import os
+from uuid import uuid4
 
 from dotenv import load_dotenv
 from fastapi import HTTPException
@@ -7,6 +8,13 @@ from pydantic_settings import BaseSettings
 load_dotenv()
 
 
+def getenv_bool(key: str, default: bool = False) -> bool:
+    value = os.getenv(key)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 # DB_TEST_PATH = './test_test.db'
 # DB_TEST_URL = f'sqlite+aiosqlite:///{DB_TEST_PATH}'
 # DB_TEST_URL_SYNC = ''.join(DB_TEST_URL.split('+aiosqlite'))
@@ -19,13 +27,60 @@ class DBSettingsBase:
     # password = None
     # database = None
 
-    def url(self, is_async: bool = True) -> str:
-        for data in [self.host, self.port, self.username, self.password, self.database]:
+    def url(self, is_async: bool = True, host: str = None, port: int = None) -> str:
+        host = host or self.host
+        port = port or self.port
+        for data in [host, port, self.username, self.password, self.database]:
             if not data:
                 raise HTTPException(status_code=500, detail='Database connection data has not been se tproperly')
         if is_async:
-            return f'postgresql+asyncpg://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}'
-        return f'postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}'
+            return (
+                f'postgresql+asyncpg://{self.username}:{self.password}@{host}:{port}/{self.database}'
+                f'?prepared_statement_cache_size={self.get_prepared_statement_cache_size()}'
+            )
+        return f'postgresql://{self.username}:{self.password}@{host}:{port}/{self.database}'
+
+    def replica_urls(self, is_async: bool = True) -> list[str]:
+        """
+        URL реплик для чтения: POSTGRES_REPLICA_HOSTS='host1:5432,host2' (порт по умолчанию как у основной БД),
+        логин, пароль и имя БД такие же, как у основной
+        """
+        urls = []
+        for replica in self.replica_hosts.split(','):
+            replica = replica.strip()
+            if not replica:
+                continue
+            host, _, port = replica.partition(':')
+            urls.append(self.url(is_async=is_async, host=host, port=port or None))
+        return urls
+
+    def get_prepared_statement_cache_size(self) -> int:
+        """
+        Размер LRU-кэша prepared statements на стороне диалекта SQLAlchemy asyncpg
+        """
+        if self.pgbouncer_transaction_mode:
+            return 0
+        return self.prepared_statement_cache_size
+
+    def engine_kwargs(self) -> dict:
+        """
+        Параметры пула соединений и драйвера для create_async_engine
+        """
+        connect_args = {'statement_cache_size': self.statement_cache_size}
+        if self.pgbouncer_transaction_mode:
+            # в режиме pool_mode=transaction PgBouncer может выполнить следующий запрос на другом серверном
+            # соединении, поэтому серверные prepared statements нельзя переиспользовать: отключаем кэш asyncpg
+            # и даем каждому prepared statement уникальное имя, чтобы не было конфликтов имен на сервере
+            connect_args['statement_cache_size'] = 0
+            connect_args['prepared_statement_name_func'] = lambda: f'__asyncpg_{uuid4()}__'
+        return dict(
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args=connect_args,
+        )
 
 
 class DBSettings(BaseSettings, DBSettingsBase):
@@ -35,10 +90,42 @@ class DBSettings(BaseSettings, DBSettingsBase):
     password: str = os.getenv('POSTGRES_PASSWORD')
     database: str = os.getenv('POSTGRES_DATABASE')
 
+    # пул соединений
+    pool_size: int = int(os.getenv('POSTGRES_POOL_SIZE', 5))
+    max_overflow: int = int(os.getenv('POSTGRES_MAX_OVERFLOW', 10))
+    pool_timeout: float = float(os.getenv('POSTGRES_POOL_TIMEOUT', 30))
+    pool_recycle: int = int(os.getenv('POSTGRES_POOL_RECYCLE', -1))
+    pool_pre_ping: bool = getenv_bool('POSTGRES_POOL_PRE_PING')
+
+    # prepared statements
+    statement_cache_size: int = int(os.getenv('POSTGRES_STATEMENT_CACHE_SIZE', 100))
+    prepared_statement_cache_size: int = int(os.getenv('POSTGRES_PREPARED_STATEMENT_CACHE_SIZE', 100))
+    pgbouncer_transaction_mode: bool = getenv_bool('POSTGRES_PGBOUNCER_TRANSACTION_MODE')
+
+    # реплики для чтения
+    replica_hosts: str = os.getenv('POSTGRES_REPLICA_HOSTS', '')
+    # закрепления за основной БД по умолчанию хранятся в памяти процесса и ставятся только чтениям
+    # с username/requesterUsername (см. ReplicaRouter)
+    read_your_writes_window: float = float(os.getenv('POSTGRES_READ_YOUR_WRITES_WINDOW', 5))
+
 
 class Settings(BaseSettings):
     server_host: str = os.getenv('SERVER_ADDRESS').split(':')[0]
     server_port: int = int(os.getenv('SERVER_ADDRESS').split(':')[1])
     db: DBSettings = DBSettings()
+    responsible_cache_size: int = int(os.getenv('RESPONSIBLE_CACHE_SIZE', 10000))
+    responsible_cache_ttl: float = float(os.getenv('RESPONSIBLE_CACHE_TTL', 60))
+    # хранение описаний версий: full - целиком в каждой версии, dedup - один раз в text_blob
+    version_storage_mode: str = os.getenv('VERSION_STORAGE_MODE', 'full')
+    text_blob_min_length: int = int(os.getenv('TEXT_BLOB_MIN_LENGTH', 256))
+    tender_list_cache_size: int = int(os.getenv('TENDER_LIST_CACHE_SIZE', 1000))
+    tender_list_cache_ttl: float = float(os.getenv('TENDER_LIST_CACHE_TTL', 30))
+    # диагностика: 0 - выключено
+    loop_lag_threshold: float = float(os.getenv('LOOP_LAG_THRESHOLD', 0))
+    slow_request_threshold: float = float(os.getenv('SLOW_REQUEST_THRESHOLD', 0))
+    profile_dir: str = os.getenv('PROFILE_DIR', 'profiles')
+    profile_sample_interval: float = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.005))
+    profile_window: float = float(os.getenv('PROFILE_WINDOW', 60))
+    profile_max_files: int = int(os.getenv('PROFILE_MAX_FILES', 100))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.fixture
+def tender_id(session_maker, organization) -> str:
+    with TestClient(app) as client:
+        return client.post('/api/tender/new', json=dict(
+            name='Tender',
+            description='Tender description',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername='responsible_1',
+        )).json()['id']
+
+
+def bid(name, tender_id, author_type, author_id):
+    return dict(
+        name=name,
+        description=f'{name} description',
+        tenderId=str(tender_id),
+        authorType=author_type,
+        authorId=str(author_id),
+    )
+
+
+def test_bulk_maps_errors_per_item(organization, tender_id):
+    employee_id = organization.employee_ids['employee']
+    missing_id = uuid.uuid4()
+    with TestClient(app) as client:
+        response = client.post('/api/bids/bulk', json=[
+            bid('User bid', tender_id, 'User', employee_id),
+            bid('Organization bid', tender_id, 'Organization', organization.id),
+            bid('Unknown user', tender_id, 'User', missing_id),
+            bid('Unknown organization', tender_id, 'Organization', missing_id),
+            bid('Unknown tender', missing_id, 'User', employee_id),
+        ])
+        assert response.status_code == 200
+        results = response.json()
+        listed = client.get(f'/api/bids/{tender_id}/list', params=dict(username='responsible_1', limit=10)).json()
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert [result['error'] and result['error']['detail'] for result in results] == [
+        None,
+        None,
+        f'Employee with id={missing_id} not found.',
+        f'Organization with id={missing_id} not found.',
+        f'Tender with id={missing_id} not found',
+    ]
+    assert {result['error']['statusCode'] for result in results[2:]} == {404}
+    created = [results[0]['bid'], results[1]['bid']]
+    assert [(item['name'], item['authorType'], item['status'], item['version']) for item in created] == [
+        ('User bid', 'User', 'Created', 1), ('Organization bid', 'Organization', 'Created', 1),
+    ]
+    assert listed == sorted(created, key=lambda item: item['name'])
+
+
+def test_bulk_statements_do_not_depend_on_size(organization, tender_id, sql_statements):
+    counts = []
+    with TestClient(app) as client:
+        for size in (2, 20):
+            sql_statements.clear()
+            response = client.post('/api/bids/bulk', json=[
+                bid(f'Bid {i}', tender_id, 'User', organization.employee_ids['employee']) for i in range(size)
+            ])
+            assert all(result['bid'] for result in response.json())
+            counts.append(len(sql_statements))
+    assert counts[0] == counts[1]
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.api.bids.dao import BidDAO
+from src.api.bids.models import MBid, BidAuthorType, BidStatus
+from src.api.bids.schemas import SBindCreate
+from src.api.employees.models import MEmployee
+from src.api.organisations.models import MOrganization, MOrganizationResponsible
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import TenderServiceType
+from src.api.tenders.schemas import STenderCreate
+
+
+@pytest.fixture
+def tender_id(session_maker, organization) -> uuid.UUID:
+    """
+    Тендер организации из фикстуры organization с предложениями:
+    от сотрудника employee, от другой организации (ответственный other_responsible) и опубликованное
+    от responsible_2; на второй тендер - еще одно предложение employee
+    """
+    async def create():
+        async with session_maker() as session:
+            m_organization = MOrganization(name='Other Organization')
+            m_employee = MEmployee(username='other_responsible')
+            session.add_all([m_organization, m_employee])
+            await session.flush()
+            session.add(MOrganizationResponsible(organization_id=m_organization.id, user_id=m_employee.id))
+
+            tender_ids = []
+            for name in ['Tender', 'Other tender']:
+                tender = await TenderDAO(db=session).create_tender(STenderCreate(
+                    name=name,
+                    description=f'{name} description',
+                    serviceType=TenderServiceType.construction,
+                    organizationId=organization.id,
+                    creatorUsername='responsible_1',
+                ))
+                tender_ids.append(tender.id)
+
+            dao = BidDAO(db=session)
+            for name, bid_tender_id, author_type, author_id, status in [
+                ('Employee bid', tender_ids[0], BidAuthorType.user, organization.employee_ids['employee'],
+                 BidStatus.created),
+                ('Other organization bid', tender_ids[0], BidAuthorType.organization, m_organization.id,
+                 BidStatus.created),
+                ('Published bid', tender_ids[0], BidAuthorType.user, organization.employee_ids['responsible_2'],
+                 BidStatus.published),
+                ('Other tender bid', tender_ids[1], BidAuthorType.user, organization.employee_ids['employee'],
+                 BidStatus.created),
+            ]:
+                bid = await dao.create_bid(SBindCreate(
+                    name=name,
+                    description=f'{name} description',
+                    tenderId=bid_tender_id,
+                    authorType=author_type,
+                    authorId=author_id,
+                ))
+                (await session.get(MBid, bid.id)).status = status
+            await session.commit()
+            return tender_ids[0]
+
+    return asyncio.run(create())
+
+
+@pytest.mark.parametrize('username, on_tender, kwargs, expected', [
+    ('responsible_1', True, {}, ['Employee bid', 'Other organization bid', 'Published bid']),
+    ('employee', True, {}, ['Employee bid', 'Published bid']),
+    ('other_responsible', True, {}, ['Other organization bid', 'Published bid']),
+    ('responsible_1', True, dict(limit=1, offset=1), ['Other organization bid']),
+    ('employee', False, {}, ['Employee bid', 'Other tender bid', 'Published bid']),
+    ('other_responsible', False, {}, ['Other organization bid', 'Published bid']),
+])
+def test_bid_list_is_one_query(session_maker, tender_id, sql_statements, username, on_tender, kwargs, expected):
+    async def get_names():
+        async with session_maker() as session:
+            dao = BidDAO(db=session)
+            page = dict(username=username, **kwargs)
+            await dao._get_employee_by_username(username=username)
+            if on_tender:
+                page['tender_id'] = tender_id
+                await dao.get_tender_by_id(tender_id=tender_id)
+            sql_statements.clear()
+            return [bid.name for bid in await dao.get_bids_by_kwargs(**page)]
+
+    assert asyncio.run(get_names()) == expected
+    # видимость, сортировка и пагинация - в одном запросе (сотрудник и тендер уже в кэше запроса)
+    assert len(sql_statements) == 1
@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.fixture
+def tender_id(session_maker, organization) -> str:
+    """
+    Два тендера организации: у сотрудника employee по предложению на каждый (отзывы f1, f2 и f3),
+    у responsible_2 - предложение на первый (отзыв other). Возвращает id первого тендера
+    """
+    with TestClient(app) as client:
+        def create_bid(tender_id, author, feedbacks):
+            bid = client.post('/api/bids/new', json=dict(
+                name='Bid',
+                description='Bid description',
+                tenderId=tender_id,
+                authorType='User',
+                authorId=str(organization.employee_ids[author]),
+            )).json()
+            for feedback in feedbacks:
+                client.put(f"/api/bids/{bid['id']}/feedback", params=dict(
+                    bidFDeedback=feedback, username='responsible_1'
+                )).raise_for_status()
+
+        tender_ids = [
+            client.post('/api/tender/new', json=dict(
+                name=name,
+                description=f'{name} description',
+                serviceType='Construction',
+                organizationId=str(organization.id),
+                creatorUsername='responsible_1',
+            )).json()['id']
+            for name in ['Tender', 'Other tender']
+        ]
+        create_bid(tender_ids[0], 'employee', ['f1', 'f2'])
+        create_bid(tender_ids[1], 'employee', ['f3'])
+        create_bid(tender_ids[0], 'responsible_2', ['other'])
+    return tender_ids[0]
+
+
+def get_review(client, tender_id, author='employee', requester='responsible_1', **params):
+    return client.get(f'/api/bids/{tender_id}/review', params=dict(
+        authorUsername=author, requesterUsername=requester, **params
+    ))
+
+
+def test_review_pages(tender_id):
+    with TestClient(app) as client:
+        feedbacks = get_review(client, tender_id, limit=10).json()
+        pages = [get_review(client, tender_id, limit=2, offset=offset).json() for offset in (0, 1, 2, 3)]
+        default_page = get_review(client, tender_id).json()
+
+    # отзывы на все предложения автора, в т.ч. на другие тендеры
+    assert sorted(feedback['description'] for feedback in feedbacks) == ['f1', 'f2', 'f3']
+    assert pages == [feedbacks[0:2], feedbacks[1:3], feedbacks[2:3], []]
+    assert default_page == feedbacks
+
+
+@pytest.mark.parametrize('author, requester, status_code', [
+    ('employee', 'employee', 403),
+    ('responsible_3', 'responsible_1', 400),
+    ('missing', 'responsible_1', 404),
+])
+def test_review_errors(tender_id, author, requester, status_code):
+    with TestClient(app) as client:
+        assert get_review(client, tender_id, author=author, requester=requester).status_code == status_code
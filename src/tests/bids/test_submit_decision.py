@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from src.api.bids.dao import BidDAO
+from src.api.bids.models import MBid, BidAuthorType, BidDecision
+from src.api.bids.schemas import SBindCreate
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import MTender, TenderServiceType, TenderStatus
+from src.api.tenders.schemas import STenderCreate
+
+
+async def create_bid(session_maker, organization):
+    async with session_maker() as session:
+        tender = await TenderDAO(db=session).create_tender(STenderCreate(
+            name='Tender',
+            description='Tender description',
+            serviceType=TenderServiceType.construction,
+            organizationId=organization.id,
+            creatorUsername=organization.responsible_usernames[0],
+        ))
+        bid = await BidDAO(db=session).create_bid(SBindCreate(
+            name='Bid',
+            description='Bid description',
+            tenderId=tender.id,
+            authorType=BidAuthorType.user,
+            authorId=organization.employee_ids['employee'],
+        ))
+        await session.commit()
+    return tender.id, bid.id
+
+
+async def approve(session_maker, bid_id, username):
+    async with session_maker() as session:
+        await BidDAO(db=session).submit_decision(bidId=bid_id, decision=BidDecision.approved, username=username)
+        await session.commit()
+
+
+async def get_state(session_maker, tender_id, bid_id):
+    async with session_maker() as session:
+        m_bid = await session.get(MBid, bid_id)
+        m_tender = await session.get(MTender, tender_id)
+        return m_bid.approved_count, m_tender.status
+
+
+def test_quorum_uses_counters_committed_after_bid_was_loaded(session_maker, organization):
+    tender_id, bid_id = asyncio.run(create_bid(session_maker, organization))
+    first, *others = organization.responsible_usernames
+
+    async def scenario():
+        async with session_maker() as session:
+            dao = BidDAO(db=session)
+            # предложение загружено в кэш запроса до того, как остальные решения закоммичены
+            await dao._get_obj_by_id(bid_id=bid_id)
+            for username in others:
+                await approve(session_maker, bid_id, username)
+            await dao.submit_decision(bidId=bid_id, decision=BidDecision.approved, username=first)
+            await session.commit()
+
+    asyncio.run(scenario())
+    assert asyncio.run(get_state(session_maker, tender_id, bid_id)) == (3, TenderStatus.closed)
+
+
+def test_concurrent_approvals_close_tender(session_maker, organization, db_url):
+    if db_url.startswith('sqlite'):
+        pytest.skip('SQLite does not support concurrent writers')
+    tender_id, bid_id = asyncio.run(create_bid(session_maker, organization))
+
+    async def scenario():
+        await asyncio.gather(*(
+            approve(session_maker, bid_id, username) for username in organization.responsible_usernames
+        ))
+
+    asyncio.run(scenario())
+    assert asyncio.run(get_state(session_maker, tender_id, bid_id)) == (3, TenderStatus.closed)
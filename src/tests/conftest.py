@@ -1,68 +1,116 @@
-# import asyncio
-# import os
-# from typing import Any
-# from typing import Generator
-#
-# import asyncpg
-# import pytest
-# from sqlalchemy import create_engine
-# from sqlalchemy.ext.asyncio import AsyncSession
-# from sqlalchemy.ext.asyncio import create_async_engine
-# from sqlalchemy.orm import sessionmaker
-# from starlette.testclient import TestClient
-#
-# from src.database.database import get_db, Base
-# # from src.api.binds.models import MTender
-# from main import app
-# from src.settings import DB_TEST_URL, DB_TEST_URL_SYNC, DB_TEST_PATH
-#
-#
-# @pytest.fixture(scope="session")
-# def event_loop():
-#     loop = asyncio.get_event_loop_policy().new_event_loop()
-#     yield loop
-#     loop.close()
-#
-#
-# @pytest.fixture(scope='function', autouse=True)
-# async def setup_test_db():
-#     if os.path.exists(DB_TEST_PATH):
-#         os.remove(DB_TEST_PATH)
-#     sync_engine = create_engine(DB_TEST_URL_SYNC, echo=False)
-#     Base.metadata.create_all(bind=sync_engine)
-#
-#
-# async def get_db_test() -> Generator:
-#     engine = create_async_engine(DB_TEST_URL, future=True, echo=False)
-#     AsyncSessionLocalTest = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-#     try:
-#         session_test: AsyncSession = AsyncSessionLocalTest()
-#         yield session_test
-#     finally:
-#         await session_test.close()
-#         if os.path.exists(DB_TEST_PATH):
-#             os.remove(DB_TEST_PATH)
-#
-#
-# @pytest.fixture(scope="session")
-# async def asyncpg_pool():
-#     pool = await asyncpg.create_pool(
-#         "".join(DB_TEST_URL_SYNC)
-#     )
-#     yield pool
-#     pool.close()
-#
-#
-# @pytest.fixture(scope="function")
-# async def client() -> Generator[TestClient, Any, None]:
-#     app.dependency_overrides[get_db] = get_db_test
-#     with TestClient(app) as client:
-#         yield client
-#
-#
-# @pytest.fixture(scope="function")
-# async def async_session() -> AsyncSession:
-#     engine = create_async_engine(DB_TEST_URL, future=True, echo=False)
-#     AsyncSessionLocalTest = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-#     async with AsyncSessionLocalTest() as session:
-#         yield session
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# настройки приложения читаются из окружения при импорте, для тестов подключение к основной БД не нужно
+for key, value in dict(
+        SERVER_ADDRESS='0.0.0.0:8080', POSTGRES_USERNAME='test', POSTGRES_PASSWORD='test',
+        POSTGRES_HOST='localhost', POSTGRES_PORT='5432', POSTGRES_DATABASE='test',
+).items():
+    os.environ.setdefault(key, value)
+
+from main import app  # noqa: E402
+from src.api.employees.models import MEmployee  # noqa: E402
+from src.api.organisations.models import (  # noqa: E402
+    MOrganization, MOrganizationResponsible, organization_type_enum,
+)
+from src.database.database import AsyncSessionLocal, Base  # noqa: E402
+
+# тесты с параметром postgresql запускаются, только если задана пустая тестовая БД, например
+# TEST_POSTGRES_URL=postgresql+asyncpg://postgres@localhost:5432/tenders_test (схема пересоздается в каждом тесте)
+TEST_POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+
+async def _recreate_schema(url: str) -> None:
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        if connection.dialect.name == 'postgresql':
+            # тип создается миграцией 0001, а не моделью (create_type=False)
+            await connection.run_sync(organization_type_enum.create, checkfirst=True)
+        await connection.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def db_url(request, tmp_path) -> str:
+    if request.param == 'sqlite':
+        url = f'sqlite+aiosqlite:///{tmp_path / "test.db"}'
+    elif TEST_POSTGRES_URL:
+        url = TEST_POSTGRES_URL
+    else:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    asyncio.run(_recreate_schema(url))
+    return url
+
+
+@pytest.fixture
+def session_maker(db_url):
+    """
+    Фабрика сессий тестовой БД, она же подставляется приложению вместо основной БД.
+    NullPool: тесты запускают корутины в разных event loop (asyncio.run, TestClient), а соединения asyncpg
+    привязаны к своему event loop
+    """
+    engine = create_async_engine(db_url, poolclass=NullPool)
+    original_bind = AsyncSessionLocal.kw['bind']
+    AsyncSessionLocal.configure(bind=engine)
+    yield sessionmaker(engine, expire_on_commit=False, autoflush=False, class_=AsyncSession)
+    AsyncSessionLocal.configure(bind=original_bind)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def sql_statements(session_maker) -> list[str]:
+    """
+    SQL-запросы, выполненные в тестовой БД, для проверки числа запросов (тест может очищать список)
+    """
+    statements = []
+    engine = session_maker.kw['bind'].sync_engine
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+@dataclass
+class Organization:
+    id: uuid.UUID
+    responsible_usernames: list[str]
+    employee_ids: dict[str, uuid.UUID]
+
+
+@pytest.fixture
+def organization(session_maker) -> Organization:
+    """
+    Организация с тремя ответственными и сотрудник без организации
+    """
+    organization = Organization(
+        id=uuid.uuid4(),
+        responsible_usernames=['responsible_1', 'responsible_2', 'responsible_3'],
+        employee_ids={},
+    )
+
+    async def create():
+        async with session_maker() as session:
+            session.add(MOrganization(id=organization.id, name='Test Organization'))
+            for username in organization.responsible_usernames + ['employee']:
+                m_employee = MEmployee(username=username)
+                session.add(m_employee)
+                await session.flush()
+                organization.employee_ids[username] = m_employee.id
+                if username in organization.responsible_usernames:
+                    session.add(MOrganizationResponsible(organization_id=organization.id, user_id=m_employee.id))
+            await session.commit()
+
+    asyncio.run(create())
+    return organization
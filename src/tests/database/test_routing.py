@@ -0,0 +1,67 @@
+import asyncio
+import time
+from urllib.parse import urlencode
+
+from fastapi import Request
+
+from src.database.routing import ReplicaRouter, InMemoryReadYourWritesBackend
+
+# движки реплик роутер только возвращает, поэтому вместо них достаточно меток
+REPLICAS = ['replica_1', 'replica_2']
+
+
+def make_request(method='GET', **params) -> Request:
+    return Request({'type': 'http', 'method': method, 'query_string': urlencode(params).encode(), 'headers': []})
+
+
+def engines_for(router, *requests):
+    async def get():
+        return [await router.engine_for(request) for request in requests]
+
+    return asyncio.run(get())
+
+
+def test_reads_go_to_replicas_round_robin():
+    router = ReplicaRouter(REPLICAS, read_your_writes_window=5)
+    assert engines_for(router, make_request(), make_request(), make_request(), make_request('POST')) == [
+        'replica_1', 'replica_2', 'replica_1', None,
+    ]
+
+
+def test_pinned_user_reads_from_primary():
+    router = ReplicaRouter(REPLICAS, read_your_writes_window=5)
+    asyncio.run(router.pin({'alice'}))
+    assert engines_for(
+        router,
+        make_request(username='alice'),
+        make_request(requesterUsername='alice', authorUsername='bob'),
+        make_request(username='bob'),
+        # чтение без username не закрепляется
+        make_request(),
+    ) == [None, None, 'replica_1', 'replica_2']
+
+
+def test_pin_expires():
+    router = ReplicaRouter(REPLICAS, read_your_writes_window=0.01)
+    asyncio.run(router.pin({'alice'}))
+    time.sleep(0.02)
+    assert engines_for(router, make_request(username='alice')) == ['replica_1']
+    assert len(router.backend) == 0
+
+
+def test_pin_is_shared_through_backend():
+    # два процесса с общим хранилищем: закрепление, сделанное в одном, видно в другом
+    backend = InMemoryReadYourWritesBackend()
+    writer = ReplicaRouter(REPLICAS, read_your_writes_window=5, backend=backend)
+    reader = ReplicaRouter(REPLICAS, read_your_writes_window=5, backend=backend)
+    asyncio.run(writer.pin({'alice'}))
+    assert engines_for(reader, make_request(username='alice')) == [None]
+    assert engines_for(ReplicaRouter(REPLICAS, read_your_writes_window=5), make_request(username='alice')) == [
+        'replica_1'
+    ]
+
+
+def test_no_pin_without_window_or_replicas():
+    for router in [ReplicaRouter(REPLICAS, read_your_writes_window=0), ReplicaRouter([], read_your_writes_window=5)]:
+        asyncio.run(router.pin({'alice'}))
+        assert len(router.backend) == 0
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from main import app
+from src.database.database import AsyncSessionLocal
+from src.monitoring.metrics import instrument_engine
+
+
+def statements_observed(route: str) -> tuple[float, float]:
+    labels = {'method': 'GET', 'route': route}
+    return (
+        REGISTRY.get_sample_value('db_statements_per_request_count', labels) or 0,
+        REGISTRY.get_sample_value('db_statements_per_request_sum', labels) or 0,
+    )
+
+
+def test_streamed_export_statements_are_counted(session_maker, organization):
+    instrument_engine(AsyncSessionLocal.kw['bind'], name='test')
+    with TestClient(app) as client:
+        client.post('/api/tender/new', json=dict(
+            name='Tender',
+            description='Tender description',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername=organization.responsible_usernames[0],
+        ))
+        count_before, sum_before = statements_observed('/api/tenders/export')
+        response = client.get('/api/tenders/export')
+        assert len(response.text.splitlines()) == 1
+
+    count_after, sum_after = statements_observed('/api/tenders/export')
+    # строки выгрузки читаются из БД во время отправки тела, уже после возврата ответа из обработчика
+    assert count_after - count_before == 1
+    assert sum_after - sum_before >= 1
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.bids.dao import BidDAO
+from src.api.tenders.dao import TenderDAO
+
+
+def test_lookups_are_memoized_per_request(session_maker, organization, sql_statements):
+    user_id = organization.employee_ids['responsible_1']
+
+    async def scenario():
+        async with session_maker() as session:
+            sql_statements.clear()
+            # кэш общий для всех DAO одной сессии, позиционные и именованные аргументы дают один ключ
+            for dao in (TenderDAO(db=session), BidDAO(db=session)):
+                await dao._get_employee_by_username('responsible_1')
+                await dao._get_employee_by_username(username='responsible_1')
+                await dao._get_organisation_by_id(organization_id=organization.id)
+                assert await dao.check_is_user_responsible(organization_id=organization.id, user_id=user_id)
+            assert len(sql_statements) == 3
+
+        async with session_maker() as session:
+            sql_statements.clear()
+            await TenderDAO(db=session)._get_employee_by_username(username='responsible_1')
+            assert len(sql_statements) == 1
+
+    asyncio.run(scenario())
+
+
+def test_not_found_is_not_memoized(session_maker, organization, sql_statements):
+    async def scenario():
+        async with session_maker() as session:
+            dao = TenderDAO(db=session)
+            sql_statements.clear()
+            for _ in range(2):
+                with pytest.raises(HTTPException) as error:
+                    await dao._get_employee_by_username(username='missing')
+                assert error.value.status_code == 404
+            assert len(sql_statements) == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+
+from src.api.organisations.cache import ResponsibleCache, responsible_cache
+from src.api.organisations.dao import OrganizationCRUD
+from src.api.organisations.models import MOrganizationResponsible
+
+
+def test_ttl():
+    organization_id, user_ids = uuid.uuid4(), frozenset({uuid.uuid4()})
+
+    cache = ResponsibleCache(max_size=10, ttl=60)
+    cache.set(organization_id, user_ids, cache.generation)
+    assert cache.get(organization_id) == user_ids
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # запись с истекшим TTL не отдается и удаляется
+    cache = ResponsibleCache(max_size=10, ttl=-1)
+    cache.set(organization_id, user_ids, cache.generation)
+    assert cache.get(organization_id) is None
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 0)
+
+
+def test_lru_eviction():
+    first, second, third = (uuid.uuid4() for _ in range(3))
+    cache = ResponsibleCache(max_size=2, ttl=60)
+    cache.set(first, frozenset(), cache.generation)
+    cache.set(second, frozenset(), cache.generation)
+    cache.get(first)
+    cache.set(third, frozenset(), cache.generation)
+    assert len(cache) == 2
+    assert cache.get(second) is None
+    assert cache.get(first) == cache.get(third) == frozenset()
+
+
+def test_invalidate():
+    first, second = uuid.uuid4(), uuid.uuid4()
+    cache = ResponsibleCache(max_size=10, ttl=60)
+    cache.set(first, frozenset(), cache.generation)
+    cache.set(second, frozenset(), cache.generation)
+
+    cache.invalidate(first)
+    assert cache.get(first) is None
+    assert cache.get(second) == frozenset()
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+    # данные, прочитанные из БД до сброса, в кэш не попадают
+    generation = cache.generation
+    cache.invalidate(second)
+    cache.set(first, frozenset(), generation)
+    assert cache.get(first) is None
+
+
+def get_responsible_user_ids(session_maker, organization_id):
+    async def get():
+        async with session_maker() as session:
+            return await OrganizationCRUD(db=session).get_responsible_user_ids(organization_id)
+
+    return asyncio.run(get())
+
+
+def add_responsible(session_maker, organization, username, commit):
+    async def add():
+        async with session_maker() as session:
+            session.add(MOrganizationResponsible(
+                organization_id=organization.id, user_id=organization.employee_ids[username]
+            ))
+            await session.flush()
+            if not commit:
+                await session.rollback()
+            # после отката коммит пустой транзакции не должен сбрасывать кэш
+            await session.commit()
+
+    asyncio.run(add())
+
+
+def test_invalidated_after_commit(session_maker, organization):
+    responsible_ids = frozenset(organization.employee_ids[username] for username in organization.responsible_usernames)
+    assert get_responsible_user_ids(session_maker, organization.id) == responsible_ids
+    assert responsible_cache.get(organization.id) == responsible_ids
+
+    # изменение откатили: кэш не сбрасывается
+    add_responsible(session_maker, organization, 'employee', commit=False)
+    assert responsible_cache.get(organization.id) == responsible_ids
+
+    add_responsible(session_maker, organization, 'employee', commit=True)
+    assert responsible_cache.get(organization.id) is None
+    assert get_responsible_user_ids(session_maker, organization.id) == (
+        responsible_ids | {organization.employee_ids['employee']}
+    )
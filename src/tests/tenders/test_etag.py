@@ -0,0 +1,101 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.bids.dao import BidDAO
+from src.api.pagination import NEXT_CURSOR_HEADER
+from src.api.tenders.dao import TenderDAO
+
+
+@pytest.fixture
+def tender(session_maker, organization) -> dict:
+    """
+    Тендер Alpha с предложением сотрудника employee и тендер Beta
+    """
+    with TestClient(app) as client:
+        tenders = [
+            client.post('/api/tender/new', json=dict(
+                name=name,
+                description=f'{name} description',
+                serviceType='Construction',
+                organizationId=str(organization.id),
+                creatorUsername='responsible_1',
+            )).json()
+            for name in ['Alpha', 'Beta']
+        ]
+        client.post('/api/bids/new', json=dict(
+            name='Bid',
+            description='Bid description',
+            tenderId=tenders[0]['id'],
+            authorType='User',
+            authorId=str(organization.employee_ids['employee']),
+        )).raise_for_status()
+    return tenders[0]
+
+
+def assert_not_modified(response, etag):
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+
+
+def test_status_not_modified(tender):
+    url = f"/api/tenders/{tender['id']}/status"
+    params = dict(username='responsible_1')
+    with TestClient(app) as client:
+        response = client.get(url, params=params)
+        etag = response.headers['etag']
+        assert response.json() == 'Created'
+
+        for if_none_match in [etag, f'W/{etag}', f'"other", {etag}', '*']:
+            assert_not_modified(client.get(url, params=params, headers={'If-None-Match': if_none_match}), etag)
+
+        client.put(url, params=dict(status='Published', **params)).raise_for_status()
+        response = client.get(url, params=params, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json() == 'Published'
+        assert response.headers['etag'] != etag
+
+
+@pytest.mark.parametrize('url, dao_method', [
+    ('/api/tenders/my', (TenderDAO, 'get_tenders_by_kwargs')),
+    ('/api/bids/my', (BidDAO, 'get_bids_by_kwargs')),
+])
+def test_list_not_modified_without_loading_page(tender, monkeypatch, url, dao_method):
+    username = 'responsible_1' if 'tenders' in url else 'employee'
+    params = dict(username=username, limit=1)
+    with TestClient(app) as client:
+        response = client.get(url, params=params)
+        etag = response.headers['etag']
+
+        # при совпадении ETag страница не загружается: ответ строится по ключам строк
+        def fail(*args, **kwargs):
+            raise AssertionError('page must not be loaded for a matching If-None-Match')
+
+        monkeypatch.setattr(*dao_method, fail)
+        not_modified = client.get(url, params=params, headers={'If-None-Match': etag})
+        monkeypatch.undo()
+        assert_not_modified(not_modified, etag)
+        assert not_modified.headers.get(NEXT_CURSOR_HEADER) == response.headers.get(NEXT_CURSOR_HEADER)
+
+        if 'tenders' in url:
+            client.patch(f"/api/tenders/{tender['id']}/edit", params=dict(username=username),
+                         json=dict(description='Changed')).raise_for_status()
+        else:
+            bid_id = response.json()[0]['id']
+            client.patch(f'/api/bids/{bid_id}/edit', params=dict(username=username),
+                         json=dict(description='Changed')).raise_for_status()
+        response = client.get(url, params=params, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json()[0]['version'] == 2
+        assert response.headers['etag'] != etag
+
+
+def test_tender_list_cursor_in_not_modified(tender):
+    params = dict(username='responsible_1', limit=1)
+    with TestClient(app) as client:
+        response = client.get('/api/tenders/my', params=params)
+        assert response.headers[NEXT_CURSOR_HEADER]
+        not_modified = client.get('/api/tenders/my', params=params, headers={'If-None-Match': response.headers['etag']})
+    assert_not_modified(not_modified, response.headers['etag'])
+    assert not_modified.headers[NEXT_CURSOR_HEADER] == response.headers[NEXT_CURSOR_HEADER]
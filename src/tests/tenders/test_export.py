@@ -0,0 +1,68 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.tenders.dao import TenderDAO
+
+TENDERS = [('Alpha', 'Construction'), ('Beta', 'Delivery'), ('Gamma', 'Construction')]
+
+
+@pytest.fixture
+def tenders(session_maker, organization) -> dict[str, dict]:
+    with TestClient(app) as client:
+        created = [
+            client.post('/api/tender/new', json=dict(
+                name=name,
+                description=f'{name} description, "quoted"\nsecond line',
+                serviceType=service_type,
+                organizationId=str(organization.id),
+                creatorUsername=organization.responsible_usernames[0],
+            )).json()
+            for name, service_type in TENDERS
+        ]
+    return {tender['name']: tender for tender in created}
+
+
+def test_export_ndjson(tenders):
+    with TestClient(app) as client:
+        response = client.get('/api/tenders/export')
+        filtered = client.get('/api/tenders/export', params=dict(service_type='Delivery'))
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row['name']: row for row in rows} == {
+        name: {column: tender[column] for column in TenderDAO.EXPORT_COLUMNS} for name, tender in tenders.items()
+    }
+    assert [json.loads(line)['name'] for line in filtered.text.splitlines()] == ['Beta']
+
+
+def test_export_csv(tenders):
+    with TestClient(app) as client:
+        response = client.get('/api/tenders/export', params=dict(format='csv'))
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.headers['content-disposition'] == 'attachment; filename="tenders.csv"'
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert tuple(reader.fieldnames) == TenderDAO.EXPORT_COLUMNS
+    rows = {row['name']: row for row in reader}
+    assert rows.keys() == tenders.keys()
+    for name, row in rows.items():
+        assert row['description'] == tenders[name]['description']
+        assert row['serviceType'] == tenders[name]['serviceType']
+        assert row['version'] == '1'
+
+
+def test_export_reads_in_batches(session_maker, tenders):
+    async def get_batches():
+        async with session_maker() as session:
+            return [batch async for batch in TenderDAO(db=session).export_tenders(batch_size=2)]
+
+    batches = asyncio.run(get_batches())
+    assert [len(batch) for batch in batches] == [2, 1]
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def test_if_match_accepts_entity_etag(session_maker, organization):
+    username = organization.responsible_usernames[0]
+    with TestClient(app) as client:
+        tender = client.post('/api/tender/new', json=dict(
+            name='Tender',
+            description='Tender description',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername=username,
+        )).json()
+        status_url = f"/api/tenders/{tender['id']}/status"
+        edit_url = f"/api/tenders/{tender['id']}/edit"
+        etag = client.get(status_url, params=dict(username=username)).headers['etag']
+
+        response = client.patch(edit_url, params=dict(username=username), json=dict(name='Renamed'),
+                                headers={'If-Match': etag})
+        assert response.status_code == 200
+        new_etag = response.headers['etag']
+        assert new_etag != etag
+        assert client.get(status_url, params=dict(username=username)).headers['etag'] == new_etag
+
+        # ETag, полученный до правки, устарел
+        response = client.patch(edit_url, params=dict(username=username), json=dict(name='Stale'),
+                                headers={'If-Match': etag})
+        assert response.status_code == 412
+
+        response = client.put(status_url, params=dict(username=username, status='Published'))
+        assert client.get(status_url, params=dict(username=username)).headers['etag'] == response.headers['etag']
+
+        response = client.patch(edit_url, params=dict(username=username), json=dict(name='By version'),
+                                headers={'If-Match': '2'})
+        assert response.status_code == 200
+        assert response.json()['version'] == 3
@@ -0,0 +1,73 @@
+import base64
+
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+# повторяющиеся названия: порядок страниц определяется парой (name, id)
+NAMES = ['Delta', 'Alpha', 'Beta', 'Beta', 'Gamma']
+
+
+def create_tenders(client: TestClient, organization) -> list[dict]:
+    return [
+        client.post('/api/tender/new', json=dict(
+            name=name,
+            description=f'{name} description',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername=organization.responsible_usernames[0],
+        )).json()
+        for name in NAMES
+    ]
+
+
+def test_cursor_round_trip(session_maker, organization):
+    username = organization.responsible_usernames[0]
+    with TestClient(app) as client:
+        tenders = create_tenders(client, organization)
+        pages, ids, after = [], [], None
+        while True:
+            params = dict(username=username, limit=2)
+            if after:
+                params['after'] = after
+            response = client.get('/api/tenders/my', params=params)
+            assert response.status_code == 200
+            pages.append([tender['name'] for tender in response.json()])
+            ids += [tender['id'] for tender in response.json()]
+            after = response.headers.get(NEXT_CURSOR_HEADER)
+            if after is None:
+                break
+
+    # последняя страница неполная, поэтому курсора на следующую нет
+    assert pages == [['Alpha', 'Beta'], ['Beta', 'Delta'], ['Gamma']]
+    assert ids == [tender['id'] for tender in sorted(tenders, key=lambda tender: (tender['name'], tender['id']))]
+
+
+def test_cursor_is_position_after_item(session_maker, organization):
+    username = organization.responsible_usernames[0]
+    with TestClient(app) as client:
+        tenders = create_tenders(client, organization)
+        expected = sorted(tenders, key=lambda tender: (tender['name'], tender['id']))
+        for index, tender in enumerate(expected):
+            response = client.get('/api/tenders/my', params=dict(
+                username=username, limit=10, after=encode_cursor(tender['name'], tender['id'])
+            ))
+            assert [item['id'] for item in response.json()] == [item['id'] for item in expected[index + 1:]]
+
+
+def test_bad_cursor(session_maker, organization):
+    username = organization.responsible_usernames[0]
+    with TestClient(app) as client:
+        create_tenders(client, organization)
+        # не base64 с JSON, id не UUID, не пара (name, id)
+        not_a_pair = base64.urlsafe_b64encode(b'["Alpha"]').decode()
+        for after in ['not-a-cursor', encode_cursor('Alpha', 'x'), not_a_pair]:
+            response = client.get('/api/tenders/my', params=dict(username=username, after=after))
+            assert response.status_code == 400, after
+            assert 'Invalid pagination cursor' in response.json()['detail']
+
+        # курсор вместе с поиском не поддерживается
+        after = client.get('/api/tenders/my', params=dict(username=username, limit=1)).headers[NEXT_CURSOR_HEADER]
+        response = client.get('/api/tenders/my', params=dict(username=username, after=after, q='alpha'))
+        assert response.status_code == 400
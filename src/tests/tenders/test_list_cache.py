@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.tenders.cache import tender_list_cache
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import TenderServiceType
+from src.api.tenders.schemas import STenderCreate
+from src.database.database import run_after_commit_callbacks
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    # кэш процессный, а БД у каждого теста своя: страницы прошлых тестов не должны отдаваться
+    asyncio.run(tender_list_cache.invalidate())
+
+
+def new_tender(organization, name) -> dict:
+    return dict(
+        name=name,
+        description=f'{name} description',
+        serviceType='Construction',
+        organizationId=str(organization.id),
+        creatorUsername='responsible_1',
+    )
+
+
+def test_cached_page_is_invalidated_after_commit(session_maker, organization, sql_statements):
+    def names(client):
+        return [tender['name'] for tender in client.get('/api/tenders/', params=dict(limit=10)).json()]
+
+    with TestClient(app) as client:
+        tender = client.post('/api/tender/new', json=new_tender(organization, 'Alpha')).json()
+        assert names(client) == ['Alpha']
+
+        hits = tender_list_cache.hits
+        sql_statements.clear()
+        assert names(client) == ['Alpha']
+        assert tender_list_cache.hits == hits + 1
+        assert sql_statements == []
+
+        client.post('/api/tender/new', json=new_tender(organization, 'Beta')).raise_for_status()
+        assert names(client) == ['Alpha', 'Beta']
+
+        client.post('/api/tenders/bulk', json=[new_tender(organization, 'Gamma')]).raise_for_status()
+        assert names(client) == ['Alpha', 'Beta', 'Gamma']
+
+        client.put(f"/api/tenders/{tender['id']}/status", params=dict(
+            username='responsible_1', status='Published'
+        )).raise_for_status()
+        page = client.get('/api/tenders/', params=dict(limit=10)).json()
+        assert [item['status'] for item in page] == ['Published', 'Created', 'Created']
+
+
+def test_cache_is_not_invalidated_after_rollback(session_maker, organization):
+    async def create_tender(commit: bool):
+        async with session_maker() as session:
+            await TenderDAO(db=session).create_tender(STenderCreate(
+                **{**new_tender(organization, 'Alpha'), 'serviceType': TenderServiceType.construction}
+            ))
+            if not commit:
+                await session.rollback()
+            await session.commit()
+            await run_after_commit_callbacks(session)
+
+    async def scenario():
+        generation = await tender_list_cache.backend.get_generation()
+        await create_tender(commit=False)
+        assert await tender_list_cache.backend.get_generation() == generation
+        await create_tender(commit=True)
+        assert await tender_list_cache.backend.get_generation() == generation + 1
+
+    asyncio.run(scenario())
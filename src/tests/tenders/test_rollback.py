@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def test_rollback_returns_tender_schema(session_maker, organization):
+    username = organization.responsible_usernames[0]
+    with TestClient(app) as client:
+        tender = client.post('/api/tender/new', json=dict(
+            name='Tender',
+            description='Tender description',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername=username,
+        )).json()
+        client.patch(f"/api/tenders/{tender['id']}/edit", params=dict(username=username),
+                     json=dict(name='Renamed', description='New description'))
+
+        response = client.put(f"/api/tenders/{tender['id']}/rollback/1", params=dict(username=username))
+
+    assert response.status_code == 200
+    assert response.json() == {**tender, 'version': 3}
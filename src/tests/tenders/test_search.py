@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import TenderServiceType
+from src.api.tenders.schemas import STenderCreate
+from src.database.search_indexes import create_search_indexes, search_extension_available
+
+
+@pytest.fixture
+def search_organization(db_url, session_maker, organization):
+    """
+    Тендеры и индексы поиска из миграции 0006 (только PostgreSQL с доступным расширением pg_trgm)
+    """
+    if not db_url.startswith('postgresql'):
+        pytest.skip('Search uses PostgreSQL full text search and pg_trgm')
+
+    async def create():
+        async with session_maker() as session:
+            connection = await session.connection()
+            if not await connection.run_sync(search_extension_available):
+                return False
+            await connection.run_sync(create_search_indexes)
+            dao = TenderDAO(db=session)
+            for name, description in [
+                ('Road construction', 'Asphalt for the city ring road'),
+                ('Office cleaning', 'Daily cleaning of the head office'),
+                ('Bridge repair', 'Repair of the river bridge'),
+                ('City cleaning', 'Cleaning of the streets after road works'),
+            ]:
+                await dao.create_tender(STenderCreate(
+                    name=name,
+                    description=description,
+                    serviceType=TenderServiceType.construction,
+                    organizationId=organization.id,
+                    creatorUsername=organization.responsible_usernames[0],
+                ))
+            await session.commit()
+        return True
+
+    if not asyncio.run(create()):
+        pytest.skip('pg_trgm extension is not available')
+    return organization
+
+
+def search(session_maker, q: str) -> list[str]:
+    async def run():
+        async with session_maker() as session:
+            return [tender.name for tender in await TenderDAO(db=session).get_tenders_by_kwargs(q=q, limit=10)]
+
+    return asyncio.run(run())
+
+
+def explain(session_maker, q: str) -> str:
+    async def run():
+        async with session_maker() as session:
+            query = await TenderDAO(db=session)._tenders_page_query(TenderDAO.PAGE_KEY_COLUMNS, q=q, limit=5)
+            # диалект сессии (asyncpg): диалект psycopg2 по умолчанию удваивает % в операторе pg_trgm
+            sql = query.compile(dialect=session.get_bind().dialect, compile_kwargs={'literal_binds': True})
+            # в тестовой таблице мало строк: запрещаем seq scan, чтобы проверить, что индексы подходят к запросу
+            await session.execute(text('SET LOCAL enable_seqscan = off'))
+            return '\n'.join((await session.execute(text(f'EXPLAIN {sql}'))).scalars())
+
+    return asyncio.run(run())
+
+
+def test_search_by_words_and_similar_names(session_maker, search_organization):
+    assert search(session_maker, 'bridge') == ['Bridge repair']
+    assert search(session_maker, 'asphalt') == ['Road construction']
+    # совпадение и в названии, и в описании выше, чем только в описании
+    assert search(session_maker, 'road') == ['Road construction', 'City cleaning']
+    assert search(session_maker, 'Road constructoin') == ['Road construction']
+    assert search(session_maker, 'offi') == ['Office cleaning']
+    # короткий q ищется только по словам, без ILIKE по всем версиям
+    assert search(session_maker, 'ro') == []
+
+
+@pytest.mark.parametrize('q, indexes', [
+    ('bridge', ['ix_tender_data_search', 'ix_tender_data_name_trgm', 'ix_tender_data_description_hash']),
+    ('ro', ['ix_tender_data_search', 'ix_tender_data_description_hash', 'ix_text_blob_search']),
+])
+def test_search_uses_gin_indexes(session_maker, search_organization, q, indexes):
+    plan = explain(session_maker, q)
+    for index in indexes:
+        assert index in plan
+    assert 'Seq Scan on tender_data' not in plan
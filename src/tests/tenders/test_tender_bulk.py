@@ -0,0 +1,60 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def tender(organization, name, username='responsible_1', organization_id=None):
+    return dict(
+        name=name,
+        description=f'{name} description',
+        serviceType='Construction',
+        organizationId=str(organization_id or organization.id),
+        creatorUsername=username,
+    )
+
+
+def test_bulk_maps_errors_per_item(session_maker, organization):
+    with TestClient(app) as client:
+        response = client.post('/api/tenders/bulk', json=[
+            tender(organization, 'First'),
+            tender(organization, 'Unknown organization', organization_id=uuid.uuid4()),
+            tender(organization, 'Unknown user', username='missing'),
+            tender(organization, 'Not responsible', username='employee'),
+            tender(organization, 'Second', username='responsible_2'),
+        ])
+        assert response.status_code == 200
+        results = response.json()
+        listed = client.get('/api/tenders/my', params=dict(username='responsible_1', limit=10)).json()
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert [result['error'] and result['error']['statusCode'] for result in results] == [None, 404, 404, 403, None]
+    assert results[2]['error']['detail'] == 'Employee with username missing not found.'
+    created = [results[0]['tender'], results[4]['tender']]
+    assert [(item['name'], item['status'], item['version']) for item in created] == [
+        ('First', 'Created', 1), ('Second', 'Created', 1),
+    ]
+    assert listed == created
+
+
+def test_bulk_without_valid_items(session_maker, organization):
+    with TestClient(app) as client:
+        response = client.post('/api/tenders/bulk', json=[tender(organization, 'Not responsible', username='employee')])
+        listed = client.get('/api/tenders/my', params=dict(username='responsible_1')).json()
+
+    assert response.json() == [dict(index=0, tender=None, error=dict(
+        statusCode=403, detail='User employee is not responsible for tender creation',
+    ))]
+    assert listed == []
+
+
+def test_bulk_statements_do_not_depend_on_size(session_maker, organization, sql_statements):
+    counts = []
+    with TestClient(app) as client:
+        for size in (2, 20):
+            sql_statements.clear()
+            response = client.post('/api/tenders/bulk', json=[tender(organization, f'Tender {i}') for i in range(size)])
+            assert all(result['tender'] for result in response.json())
+            counts.append(len(sql_statements))
+    assert counts[0] == counts[1]
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.api.employees.models import MEmployee
+from src.api.organisations.models import MOrganization, MOrganizationResponsible
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import MTender, TenderServiceType, TenderStatus
+from src.api.tenders.schemas import STenderCreate
+
+
+async def create_other_organization(session_maker) -> uuid.UUID:
+    """
+    Вторая организация с ответственным other_responsible
+    """
+    async with session_maker() as session:
+        m_organization = MOrganization(name='Other Organization')
+        m_employee = MEmployee(username='other_responsible')
+        session.add_all([m_organization, m_employee])
+        await session.flush()
+        session.add(MOrganizationResponsible(organization_id=m_organization.id, user_id=m_employee.id))
+        await session.commit()
+        return m_organization.id
+
+
+async def create_tenders(
+        session_maker, organization_id, creator, names,
+        status=TenderStatus.created, service_type=TenderServiceType.construction,
+):
+    async with session_maker() as session:
+        dao = TenderDAO(db=session)
+        for name in names:
+            tender = await dao.create_tender(STenderCreate(
+                name=name,
+                description=f'{name} description',
+                serviceType=service_type,
+                organizationId=organization_id,
+                creatorUsername=creator,
+            ))
+            (await session.get(MTender, tender.id)).status = status
+        await session.commit()
+
+
+@pytest.fixture
+def tenders(session_maker, organization):
+    """
+    Тендеры организации из фикстуры organization (не опубликованы) и другой организации:
+    Beta не опубликован, Gamma и Epsilon опубликованы
+    """
+    other_organization_id = asyncio.run(create_other_organization(session_maker))
+    asyncio.run(create_tenders(session_maker, organization.id, 'responsible_1', ['Delta', 'Alpha']))
+    asyncio.run(create_tenders(
+        session_maker, other_organization_id, 'other_responsible', ['Beta'], service_type=TenderServiceType.delivery
+    ))
+    asyncio.run(create_tenders(
+        session_maker, other_organization_id, 'other_responsible', ['Gamma', 'Epsilon'], status=TenderStatus.published
+    ))
+
+
+@pytest.mark.parametrize('kwargs, expected', [
+    (dict(username='responsible_1'), ['Alpha', 'Delta', 'Epsilon', 'Gamma']),
+    (dict(username='other_responsible'), ['Beta', 'Epsilon', 'Gamma']),
+    (dict(username='employee'), ['Epsilon', 'Gamma']),
+    (dict(username='responsible_1', limit=2, offset=1), ['Delta', 'Epsilon']),
+    (dict(service_type=TenderServiceType.delivery), ['Beta']),
+    (dict(limit=3), ['Alpha', 'Beta', 'Delta']),
+])
+def test_tender_list_is_one_query(session_maker, tenders, sql_statements, kwargs, expected):
+    async def get_names():
+        async with session_maker() as session:
+            dao = TenderDAO(db=session)
+            if 'username' in kwargs:
+                await dao._get_employee_by_username(username=kwargs['username'])
+            sql_statements.clear()
+            return [tender.name for tender in await dao.get_tenders_by_kwargs(**kwargs)]
+
+    assert asyncio.run(get_names()) == expected
+    # права доступа, фильтр, сортировка и пагинация - в одном запросе (сотрудник уже в кэше запроса)
+    assert len(sql_statements) == 1
@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.fixture
+def tender_id(session_maker, organization) -> str:
+    """
+    Тендер с тремя версиями: 1 - исходная, 2 - новое название, 3 - новая вторая строка описания
+    """
+    params = dict(username='responsible_1')
+    with TestClient(app) as client:
+        tender = client.post('/api/tender/new', json=dict(
+            name='Alpha',
+            description='line one\nline two',
+            serviceType='Construction',
+            organizationId=str(organization.id),
+            creatorUsername='responsible_1',
+        )).json()
+        client.patch(f"/api/tenders/{tender['id']}/edit", params=params, json=dict(name='Beta')).raise_for_status()
+        client.patch(f"/api/tenders/{tender['id']}/edit", params=params,
+                     json=dict(description='line one\nline 2')).raise_for_status()
+    return tender['id']
+
+
+def get_versions(tender_id, username='responsible_1', **params):
+    with TestClient(app) as client:
+        return client.get(f'/api/tenders/{tender_id}/versions', params=dict(username=username, **params))
+
+
+def test_version_range(tender_id):
+    versions = get_versions(tender_id).json()['versions']
+    assert versions == [
+        dict(version=1, name='Alpha', description='line one\nline two', serviceType='Construction'),
+        dict(version=2, name='Beta', description='line one\nline two', serviceType='Construction'),
+        dict(version=3, name='Beta', description='line one\nline 2', serviceType='Construction'),
+    ]
+    for params, expected in [
+        (dict(fromVersion=2), [2, 3]),
+        (dict(toVersion=2), [1, 2]),
+        (dict(fromVersion=2, limit=1), [2]),
+        (dict(fromVersion=4), []),
+    ]:
+        response = get_versions(tender_id, **params).json()
+        assert [version['version'] for version in response['versions']] == expected, params
+        assert response['diff'] is None
+
+
+def test_version_fields(tender_id):
+    assert get_versions(tender_id, fields='name').json()['versions'] == [
+        dict(version=1, name='Alpha'), dict(version=2, name='Beta'), dict(version=3, name='Beta'),
+    ]
+    response = get_versions(tender_id, fields='name,budget')
+    assert response.status_code == 400
+    assert "['budget']" in response.json()['detail']
+
+
+def test_version_diff(tender_id):
+    diff = get_versions(tender_id, diffFrom=1, diffTo=3).json()['diff']
+    assert (diff['fromVersion'], diff['toVersion']) == (1, 3)
+    assert diff['changes'].keys() == {'name', 'description'}
+    assert diff['changes']['name'].splitlines()[2:] == ['@@ -1 +1 @@', '-Alpha', '+Beta']
+    assert diff['changes']['description'].splitlines() == [
+        '--- description@1', '+++ description@3', '@@ -1,2 +1,2 @@', ' line one', '-line two', '+line 2',
+    ]
+
+    # версии для diff вне диапазона дочитываются, diff только по выбранным полям
+    response = get_versions(tender_id, fromVersion=3, fields='name', diffFrom=1, diffTo=2).json()
+    assert response['versions'] == [dict(version=3, name='Beta')]
+    assert response['diff']['changes'].keys() == {'name'}
+
+    assert get_versions(tender_id, diffFrom=2, diffTo=2).json()['diff']['changes'] == {}
+
+
+@pytest.mark.parametrize('params, status_code', [
+    (dict(diffFrom=1), 400),
+    (dict(diffFrom=1, diffTo=9), 404),
+    (dict(username='employee'), 403),
+    (dict(fromVersion=0), 422),
+])
+def test_version_errors(tender_id, params, status_code):
+    assert get_versions(tender_id, **{'username': 'responsible_1', **params}).status_code == status_code
+
+
+def test_bid_versions(session_maker, organization, tender_id):
+    params = dict(username='employee')
+    with TestClient(app) as client:
+        bid = client.post('/api/bids/new', json=dict(
+            name='Bid',
+            description='Bid description',
+            tenderId=tender_id,
+            authorType='User',
+            authorId=str(organization.employee_ids['employee']),
+        )).json()
+        client.patch(f"/api/bids/{bid['id']}/edit", params=params, json=dict(name='Renamed')).raise_for_status()
+        response = client.get(f"/api/bids/{bid['id']}/versions", params=dict(
+            fields='name', diffFrom=1, diffTo=2, **params
+        )).json()
+
+    assert response['versions'] == [dict(version=1, name='Bid'), dict(version=2, name='Renamed')]
+    assert response['diff']['changes'].keys() == {'name'}
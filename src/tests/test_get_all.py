@@ -0,0 +1,46 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import app, table_batches
+from src.api.employees.models import MEmployee
+
+
+def get_ids(client, url, **params) -> list[str]:
+    response = client.get(url, params=params)
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+    return [row['id'] for row in response.json()]
+
+
+def test_get_all_pages_by_id(organization):
+    ids = sorted(str(id) for id in organization.employee_ids.values())
+    with TestClient(app) as client:
+        employees = client.get('/employee/get_all').json()
+        assert [employee['id'] for employee in employees] == ids
+        assert {employee['username'] for employee in employees} == organization.employee_ids.keys()
+        assert employees[0].keys() == {column.name for column in MEmployee.__table__.columns}
+
+        assert get_ids(client, '/employee/get_all', limit=2) == ids[:2]
+        assert get_ids(client, '/employee/get_all', after=ids[1]) == ids[2:]
+        assert get_ids(client, '/employee/get_all', after=ids[0], limit=2) == ids[1:3]
+        assert get_ids(client, '/employee/get_all', after=ids[-1]) == []
+        assert client.get('/employee/get_all', params=dict(limit=0)).status_code == 422
+
+        assert client.get('/organisation/get_all').json()[0]['name'] == 'Test Organization'
+        responsibles = client.get('/organisation_responsible/get_all').json()
+        assert sorted(row['user_id'] for row in responsibles) == sorted(
+            str(organization.employee_ids[username]) for username in organization.responsible_usernames
+        )
+
+
+def test_table_is_read_in_batches(session_maker, organization):
+    async def get_batches():
+        async with session_maker() as session:
+            return [
+                batch async for batch in
+                table_batches(session, MEmployee.__table__, limit=None, after=None, batch_size=3)
+            ]
+
+    batches = asyncio.run(get_batches())
+    assert [len(batch) for batch in batches] == [3, 1]
@@ -0,0 +1,46 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from src.api.tenders.dao import TenderDAO
+from src.api.tenders.models import MTenderData, TenderServiceType
+from src.api.tenders.schemas import STenderCreate, STenderUpdate
+from src.api.text_blobs.dao import VersionStorageMode
+from src.api.text_blobs.models import MTextBlob
+from src.settings import settings
+
+
+def test_dedup_stores_description_once(session_maker, organization, monkeypatch):
+    monkeypatch.setattr(settings, 'version_storage_mode', VersionStorageMode.dedup)
+    monkeypatch.setattr(settings, 'text_blob_min_length', 10)
+    description = 'Long tender description'
+    username = organization.responsible_usernames[0]
+
+    async def scenario():
+        async with session_maker() as session:
+            dao = TenderDAO(db=session)
+            tender = await dao.create_tender(STenderCreate(
+                name='Tender',
+                description=description,
+                serviceType=TenderServiceType.construction,
+                organizationId=organization.id,
+                creatorUsername=username,
+            ))
+            await dao.update_tender_by_id(tender.id, STenderUpdate(name='Renamed'), username)
+            # тот же текст еще раз: INSERT ... ON CONFLICT DO NOTHING
+            await dao.create_tender(STenderCreate(
+                name='Other tender',
+                description=description,
+                serviceType=TenderServiceType.delivery,
+                organizationId=organization.id,
+                creatorUsername=username,
+            ))
+            await session.commit()
+        async with session_maker() as session:
+            blobs = (await session.execute(select(func.count()).select_from(MTextBlob))).scalar_one()
+            descriptions = (await session.execute(select(MTenderData.description))).scalars().all()
+            return blobs, descriptions
+
+    blobs, descriptions = asyncio.run(scenario())
+    assert blobs == 1
+    assert descriptions == [description] * 3